@@ -1,11 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import socket
-import subprocess
+import errno
 import re
 import json
 from datetime import datetime
 import logging
+import logging.handlers
+import queue
+import atexit
 import os
 import sys
 from flask import Flask, render_template, jsonify, request
@@ -15,19 +19,64 @@ import webbrowser
 import ssl
 import platform
 import concurrent.futures
+import functools
+import bisect
+from collections import deque
+import sqlite3
+import gzip
+import base64
+import mmap
+import struct
+import math
+from array import array
+import heapq
+import asyncio
+import ipaddress
+from urllib.parse import urlparse, urljoin
+from requests.structures import CaseInsensitiveDict
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
 # Configuration
 CONFIG = {
     "rpc_url": "http://mainnet.basedaibridge.com/rpc",
+    "expected_chain_id": os.environ.get('EXPECTED_CHAIN_ID'),  # Sinon fixée par le premier bloc de tête du RPC principal
     "rpc_port": 8545,
     "domain": "mainnet.basedaibridge.com",
     "main_domain": "basedaibridge.com",
     "check_interval": 60,
     "dns_check_interval": 600,
     "log_file": "basedai_monitor.log",
+    "log_level": os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    "log_max_bytes": int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024))),  # Rotation par taille
+    "log_rotate_when": os.environ.get('LOG_ROTATE_WHEN'),  # Rotation par date à la place (ex. "midnight")
+    "log_backup_count": int(os.environ.get('LOG_BACKUP_COUNT', '5')),
+    "log_stdout_format": os.environ.get('LOG_STDOUT_FORMAT', 'text'),  # text ou json (le fichier est en JSON)
+    "log_repeat_window": int(os.environ.get('LOG_REPEAT_WINDOW', '60')),  # Avertissements/erreurs identiques : un par fenêtre (s)
     "ports_to_check": [80, 443, 8545, 30333, 9933, 9944],
     "latency_threshold": 0.5,
-    "history_size": 120,
+    "history_size": 120,            # Points d'historique renvoyés par /api/data
+    "ping_history_size": 20,
+    "delta_version_window": 120,    # Versions publiées pour lesquelles /api/data?since= sait répondre
+    "snapshot_gzip_level": int(os.environ.get('SNAPSHOT_GZIP_LEVEL', '6')),  # 0 pour ne pas pré-compresser
+    "stream_heartbeat": 15,         # Intervalle (s) des commentaires keep-alive de /api/stream
+    # Flux /api/stream simultanés par processus : chacun occupe un thread, au-delà 503 et le client reste en polling
+    "max_streams": int(os.environ.get('MAX_STREAMS', '4')),
+    # Buckets agrégés servis par /api/history : nombre de buckets gardés par résolution
+    "history_buckets": {"minute": 1440, "hour": 24 * 30, "day": 366},
+    "ping_history_capacity": int(os.environ.get('PING_HISTORY_CAPACITY', '17280')),  # Pings gardés en mémoire (~1 jour)
     "web_port": 5000,
+    # Mode de service : standalone (sondes et serveur de dev dans un processus), monitor (sondes seules,
+    # qui écrivent le store) ou web (workers gunicorn en lecture seule sur le store)
+    "serve_mode": os.environ.get('SERVE_MODE', 'standalone'),
+    "snapshot_store": os.environ.get('SNAPSHOT_STORE', 'snapshots'),  # Répertoire local partagé
+    "refresh_min_interval": int(os.environ.get('REFRESH_MIN_INTERVAL', '30')),  # Délai minimal (s) entre deux /api/refresh d'une cible
+    "store_stale_after": 10,        # Âge (s) au-delà duquel l'enregistrement du processus de surveillance est périmé
+    "store_poll_interval": 1,       # Intervalle (s) de relecture du store (flux SSE, demandes de rafraîchissement)
+    "store_raw_window": 3600,       # Pings bruts (s) recopiés dans le store pour /api/history?resolution=raw
+    "store_history_interval": 10,   # Réécriture (s) des historiques du store, en plus de chaque clôture de bucket
+    "store_segment_size": int(os.environ.get('STORE_SEGMENT_SIZE', str(1 << 20))),  # Taille initiale d'un segment mmap
+    "store_read_retries": 100,      # Lectures concurrentes d'une écriture avant de servir la copie précédente
     "fallback_rpc_urls": [
         "https://eth.public-rpc.com",
         "https://rpc.ankr.com/eth",
@@ -35,64 +84,581 @@ CONFIG = {
     ],
     "disable_dns_checks": os.environ.get('DISABLE_DNS_CHECKS', 'false').lower() == 'true',
     "disable_port_checks": os.environ.get('DISABLE_PORT_CHECKS', 'false').lower() == 'true',
+    "port_scan_timeout": float(os.environ.get('PORT_SCAN_TIMEOUT', 5)),  # Fenêtre unique pour tous les ports
     "ping_timeout": 5,
     "ping_retries": 3,
     "use_tcp_ping": os.environ.get('USE_TCP_PING', 'true').lower() == 'true',
     "bfexplorer_api_url": "https://explorer.bf1337.org/api/v1",
     "dns_api_timeout": 10,
+    "dns_query_timeout": 3,         # Timeout (s) de chaque requête DNS native
+    "dns_check_servers": ['8.8.8.8', '1.1.1.1', '208.67.222.222'],
+    # Cache de résolution : TTL des enregistrements borné à [min, max] secondes
+    "dns_cache_min_ttl": 5,
+    "dns_cache_max_ttl": int(os.environ.get('DNS_CACHE_MAX_TTL', '3600')),
     "http_request_timeout": 15,
     "http_retry_attempts": 3,
     "http_retry_delay": 1,
     # Facteurs de correction pour compenser le temps de traitement
-    "rpc_correction_factor": 0.15,  # Divise la mesure par ~6.67 (341ms * 0.15 ≈ 51ms)
     "ping_correction_factor": 0.6,   # Divise la mesure par ~1.67 (79ms * 0.6 ≈ 47ms)
     "min_latency_ms": 10,           # Latence minimale attendue
-    "max_latency_ms": 200           # Latence maximale plausible
+    "max_latency_ms": 200,          # Latence maximale plausible
+    # Pools de connexions HTTP keep-alive
+    "http_pool_maxsize": int(os.environ.get('HTTP_POOL_MAXSIZE', '4')),
+    "http_keepalive_idle": 30,      # Durée max (s) d'une connexion inactive dans le pool
+    "http_connect_timeout": 5,      # Timeout de connexion distinct du timeout de requête
+    "snapshot_timeout": 10,         # Timeout des requêtes HTTP/HTTPS/TLS partagées du cycle
+    # Sonde RPC : lots JSON-RPC sur une connexion gardée chaude, percentiles sur une fenêtre glissante
+    "rpc_batches_per_cycle": 3,
+    "rpc_batch_timeout": 2,
+    "rpc_keepalive_idle": 300,      # Durée max (s) d'inactivité de la connexion RPC avant réouverture
+    "rpc_latency_window": int(os.environ.get('RPC_LATENCY_WINDOW', '60')),  # Mesures gardées par endpoint
+    # Requêtes couvertes (hedging) : les fallbacks sont lancés si le primaire n'a pas répondu
+    # après son p95 récent × rpc_hedge_factor (borné), puis le premier résultat valide l'emporte
+    "rpc_hedge_factor": 1.5,
+    "rpc_hedge_min_delay": 0.2,
+    "rpc_hedge_max_delay": 5,
+    "rpc_hedge_default_delay": 2,   # Sans historique de latence pour le primaire
+    "rpc_health_decay": 0.8,        # Score de santé : moyenne mobile exponentielle des succès (0 à 1)
+    "rpc_health_demote_threshold": 0.3,  # Sous ce score, un fallback n'est lancé qu'en dernier recours
+    # Suivi des blocs : blocs lus par lot JSON-RPC et au plus par cycle (rattrapage progressif)
+    "block_batch_size": 50,
+    "block_follow_max_blocks": int(os.environ.get('BLOCK_FOLLOW_MAX_BLOCKS', '1000')),
+    "block_stats_window": 100,      # Blocs récents pour le temps de bloc moyen et le TPS
+    # Stockage des séries temporelles (SQLite) ; chaîne vide pour désactiver
+    "timeseries_db": os.environ.get('TIMESERIES_DB', 'basedai_timeseries.db'),
+    "timeseries_flush_interval": 10,
+    # Rétention (s) par niveau : brut, 1 minute, 1 heure, 1 jour
+    "timeseries_retention": {
+        "raw": int(os.environ.get('TIMESERIES_RAW_RETENTION', str(2 * 86400))),
+        "1m": int(os.environ.get('TIMESERIES_1M_RETENTION', str(14 * 86400))),
+        "1h": int(os.environ.get('TIMESERIES_1H_RETENTION', str(180 * 86400))),
+        "1d": int(os.environ.get('TIMESERIES_1D_RETENTION', str(5 * 365 * 86400)))
+    },
+    # Ordonnanceur des sondes
+    "probe_max_workers": int(os.environ.get('PROBE_MAX_WORKERS', '8')),
+    "max_concurrent_targets": int(os.environ.get('MAX_CONCURRENT_TARGETS', '16')),
+    # Intervalles adaptatifs : recul progressif si rien ne change, rafale après un incident
+    "adaptive_intervals": os.environ.get('ADAPTIVE_INTERVALS', 'true').lower() == 'true',
+    "interval_backoff_factor": 1.5,
+    "max_intervals": {"cycle": 300, "ping": 30, "dns": 3600},
+    "burst_intervals": {"cycle": 15, "ping": 1, "dns": 60},
+    "burst_window": int(os.environ.get('BURST_WINDOW', '300')),  # Durée (s) du mode rafale
+    # Cache des faits lents à changer : TTL (s) par sonde, servis périmés pendant leur rafraîchissement
+    "probe_cache_ttls": {
+        "ssl_info": int(os.environ.get('SSL_CACHE_TTL', '3600')),
+        "txt_info": 900,
+        "dns_records": 900,
+        "main_domain_info": 900
+    },
+    "probe_cycle_deadline": float(os.environ.get('PROBE_CYCLE_DEADLINE', '45'))
 }
 # Variables globales
-check_history = []
-previous_results = {}
-last_dns_serial = None
-ping_history = []
 ping_update_interval = 5
-latest_data = {
-    "rpc_status": "unknown",
-    "ping_status": "unknown",
-    "server_status": "unknown",
-    "version_info": "N/A",
-    "ip_info": "N/A",
-    "http_info": "N/A",
-    "security_info": "N/A",
-    "txt_info": "N/A",
-    "main_domain_info": {"ip": "N/A", "redirect": "N/A"},
-    "port_statuses": {},
-    "last_check": "",
-    "history": [],
-    "alerts": [],
-    "ssl_info": {},
-    "dns_records": {},
-    "network_info": {},
-    "transactions": {},
-    "ping_history": [],
-    "ip_consistent": False
-}
-# Variables pour les alertes persistantes
-rpc_status_alert = None
-server_status_alert = None
-last_ip_log_time = 0  # Pour le logging périodique des IP
-last_block_number = 0  # Pour suivre le dernier bloc connu
-last_tx_count = 94079  # Pour suivre le dernier nombre de transactions (initialisé à 94.079K)
+# Sondes disponibles pour chaque cible (clé "probes" d'une cible pour en restreindre la liste)
+ALL_PROBES = [
+    "rpc", "ports", "ping", "ip_info", "http_info", "security_info", "ssl_info", "version_info",
+    "txt_info", "dns_records", "network_info", "transactions", "main_domain_info", "ip_consistent"
+]
+
+class RingBuffer:
+    """Historique à capacité fixe stocké en colonnes array('d').
+    
+    L'ajout est en O(1) sans réallocation ; views() expose les données sans copie et
+    les dictionnaires ne sont construits qu'à la sérialisation (to_dicts). Les valeurs
+    absentes sont stockées en NaN et restituées en None.
+    """
+    __slots__ = ("capacity", "columns", "start", "size", "total")
+    
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.columns = {field: array('d', bytes(8 * capacity)) for field in ("ts",) + tuple(fields)}
+        self.start = 0
+        self.size = 0
+        self.total = 0  # Nombre total d'ajouts depuis la création
+    
+    def __len__(self):
+        return self.size
+    
+    def append(self, ts, **values):
+        index = (self.start + self.size) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        self.columns["ts"][index] = ts
+        for field, column in self.columns.items():
+            if field != "ts":
+                value = values.get(field)
+                column[index] = math.nan if value is None else value
+        self.total += 1
+    
+    def views(self, field, last=None, skip=0):
+        """Renvoie les points (au plus `last`, les plus récents hors `skip` derniers) en une ou deux memoryview contiguës"""
+        available = max(self.size - skip, 0)
+        count = available if last is None else min(last, available)
+        first = (self.start + available - count) % self.capacity
+        column = memoryview(self.columns[field])
+        if first + count <= self.capacity:
+            return (column[first:first + count],)
+        return (column[first:], column[:first + count - self.capacity])
+    
+    def count_since(self, ts):
+        """Nombre de points d'horodatage >= ts (les horodatages sont croissants)"""
+        count = 0
+        for view in reversed(self.views("ts")):
+            position = bisect.bisect_left(view, ts)
+            count += len(view) - position
+            if position:
+                break
+        return count
+    
+    def to_dicts(self, last=None, include_ts=False, skip=0):
+        """Matérialise les points les plus récents en dictionnaires (horodatage formaté)"""
+        fields = list(self.columns)
+        series = {field: [v for view in self.views(field, last, skip) for v in view] for field in fields}
+        points = []
+        for i, ts in enumerate(series["ts"]):
+            point = {}
+            for field in fields[1:]:
+                value = series[field][i]
+                point[field] = None if math.isnan(value) else value
+            point["timestamp"] = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+            if include_ts:
+                point["ts"] = ts
+            points.append(point)
+        return points
+
+class Record:
+    """Enregistrement à champs fixes (__slots__), jamais modifié après sa création.
+    
+    Un écrivain publie une nouvelle version par replace() puis remplace la référence dans l'état :
+    les lecteurs voient l'ancienne ou la nouvelle version, jamais un mélange des deux.
+    """
+    __slots__ = ()
+    DEFAULTS = {}
+    
+    def __init__(self, **values):
+        unknown = set(values) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(sorted(unknown))}")
+        for field in self.__slots__:
+            object.__setattr__(self, field, values.get(field, self.DEFAULTS.get(field)))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace()")
+    
+    def replace(self, **changes):
+        """Copie avec certains champs remplacés (copie sur écriture)"""
+        return type(self)(**dict(self.as_dict(), **changes))
+    
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class CycleRecord(Record):
+    """Résultats d'un cycle de sondes : seul update_data écrit ce groupe"""
+    __slots__ = (
+        "target", "server_status", "rpc_status", "rpc_value", "version_info", "ip_info", "http_info",
+        "security_info", "txt_info", "main_domain_info", "port_statuses", "port_scan", "ssl_info",
+        "dns_records", "network_info", "transactions", "ip_consistent", "dns_resolution",
+        "last_check", "last_dns_check", "alerts"
+    )
+    DEFAULTS = {
+        "server_status": "unknown",
+        "rpc_status": "unknown",
+        "version_info": "N/A",
+        "ip_info": "N/A",
+        "http_info": "N/A",
+        "security_info": "N/A",
+        "txt_info": "N/A",
+        "main_domain_info": {"ip": "N/A", "redirect": "N/A"},
+        "port_statuses": {},
+        "port_scan": {},
+        "ssl_info": {},
+        "dns_records": {},
+        "network_info": {},
+        "transactions": {},
+        "ip_consistent": False,
+        "last_check": "",
+        "last_dns_check": 0,
+        "alerts": ()
+    }
+
+class PingRecord(Record):
+    """Dernière mesure de latence : seul update_ping écrit ce groupe"""
+    __slots__ = ("ping_status", "ping_value")
+    DEFAULTS = {"ping_status": "unknown"}
+
+def published_fields(state):
+    """Champs publiés d'une cible, assemblés à partir des groupes de champs en vigueur.
+    
+    Les sondes lentes en cache (probe_cache, écrit par leurs rafraîchissements) priment sur les valeurs du
+    cycle : un rafraîchissement en arrière-plan est publié sans toucher au CycleRecord d'update_data.
+    """
+    fields = state["cycle"].as_dict()
+    fields.update(state["ping"].as_dict())
+    fields.update({name: entry["value"] for name, entry in state["probe_cache"].items()})
+    return fields
+
+def new_target_state(target):
+    """État propre à une cible (données publiées, historique, alertes, compteurs)"""
+    return {
+        # Données publiées, par groupe de champs à écrivain unique (remplacés d'un bloc)
+        "cycle": CycleRecord(target=target["name"]),
+        "ping": PingRecord(),
+        # Historiques en mémoire, matérialisés seulement à la sérialisation
+        "check_history": RingBuffer(CONFIG["history_size"], ("ping", "rpc")),
+        "ping_history": RingBuffer(CONFIG["ping_history_capacity"], ("ping", "rpc")),
+        # Buckets [début, somme ping, nb ping, somme rpc, nb rpc] mis à jour à chaque échantillon
+        "history_buckets": {
+            resolution: deque(maxlen=size) for resolution, size in CONFIG["history_buckets"].items()
+        },
+        # Versionnement des données publiées (ETag et réponses delta de /api/data)
+        "version": 0,
+        "key_versions": {},              # Champ publié -> version de sa dernière modification
+        "published_fingerprints": {},    # Clé -> JSON publié, pour détecter les modifications
+        "version_marks": deque(maxlen=CONFIG["delta_version_window"]),  # (version, total check_history, total ping_history)
+        # Snapshot immuable publié à chaque version (remplacé d'un bloc, jamais modifié)
+        "snapshot": None,
+        "history_written": (0, None),    # Dernière copie des historiques dans le store : (horodatage, bucket minute courant)
+        "status": None,          # Statut de l'ordonnanceur au moment de la dernière publication
+        # Ordonnancement adaptatif : intervalle courant par sonde, signature du dernier résultat, rafale
+        "intervals": {"cycle": target["check_interval"], "ping": target["ping_interval"], "dns": target["dns_check_interval"]},
+        "probe_signatures": {},
+        "burst_until": 0,
+        "run_now": False,        # Cycle et ping à lancer tout de suite (rafale, rafraîchissement forcé)
+        "force_dns_check": False,
+        # Résultats des sondes lentes à changer : nom -> {"value", "fetched_at"}
+        "probe_cache": {},
+        "probe_refreshing": set(),
+        "next_due": {},          # Échéance en vigueur par type de tâche (les autres entrées du tas sont périmées)
+        "rpc_windows": {},  # Endpoint RPC -> latences récentes (ms) pour les percentiles
+        "rpc_health": {},   # Endpoint RPC -> score de santé, victoires et échecs des courses
+        "previous_results": {},
+        "last_dns_serial": None,
+        # Alertes persistantes
+        "rpc_status_alert": None,
+        "server_status_alert": None,
+        "last_ip_log_time": 0,  # Pour le logging périodique des IP
+        "last_dns_resolution": 0,  # Horodatage de la dernière résolution enregistrée comme échantillon
+        "last_block_number": 0,  # Dernier bloc compté (checkpoint du suivi des blocs)
+        "last_tx_count": target["initial_tx_count"],  # Nombre total de transactions compté
+        "chain_id": target["expected_chain_id"],  # Chaîne suivie : un endpoint d'une autre chaîne est ignoré
+        "endpoint_chains": {},   # Chaîne annoncée par chaque endpoint RPC (eth_chainId)
+        "checkpoint_chain_id": None,  # Chaîne du checkpoint repris, à confirmer par le RPC principal
+        "recent_blocks": deque(maxlen=CONFIG["block_stats_window"]),  # (numéro, horodatage, nb de transactions)
+    }
+
+def chain_id_of(value):
+    """Identifiant de chaîne canonique (0x... en minuscules) : entier, décimal ou hexadécimal, None si invalide"""
+    if isinstance(value, int):
+        return hex(value)
+    try:
+        return hex(int(str(value), 0))
+    except ValueError:
+        return None
+
+def load_targets():
+    """Construit le registre des cibles : TARGETS_FILE (liste JSON) ou la cible de CONFIG"""
+    targets_file = os.environ.get('TARGETS_FILE')
+    if targets_file:
+        with open(targets_file, encoding='utf-8') as f:
+            definitions = json.load(f)
+    else:
+        definitions = [{
+            "name": os.environ.get('TARGET_NAME', 'basedai'),
+            "domain": CONFIG["domain"],
+            "rpc_url": CONFIG["rpc_url"],
+            "main_domain": CONFIG["main_domain"],
+            "fallback_rpc_urls": CONFIG["fallback_rpc_urls"],
+            "expected_chain_id": CONFIG["expected_chain_id"],
+            "initial_tx_count": 94079  # Initialisé à 94.079K
+        }]
+    
+    registry = {}
+    for definition in definitions:
+        target = {
+            "name": definition.get("name", definition["domain"]),
+            "domain": definition["domain"],
+            "rpc_url": definition.get("rpc_url"),
+            "main_domain": definition.get("main_domain", definition["domain"]),
+            "fallback_rpc_urls": definition.get("fallback_rpc_urls", []),
+            "expected_chain_id": chain_id_of(definition.get("expected_chain_id")),
+            "ports_to_check": definition.get("ports_to_check", CONFIG["ports_to_check"]),
+            "check_interval": definition.get("check_interval", CONFIG["check_interval"]),
+            "dns_check_interval": definition.get("dns_check_interval", CONFIG["dns_check_interval"]),
+            "ping_interval": definition.get("ping_interval", ping_update_interval),
+            "probes": definition.get("probes", ALL_PROBES),
+            "initial_tx_count": definition.get("initial_tx_count", 0)
+        }
+        if not target["rpc_url"]:
+            # Sans RPC, les sondes qui en dépendent sont désactivées
+            target["probes"] = [p for p in target["probes"] if p not in ["rpc", "transactions"]]
+        if target["name"] in registry:
+            raise ValueError(f"Duplicate target name: {target['name']}")
+        target["state"] = new_target_state(target)
+        registry[target["name"]] = target
+    return registry
+
+# Registre des cibles surveillées, dans l'ordre de déclaration
+targets = load_targets()
+default_target = next(iter(targets.values()))
+class ProbeExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Pool de threads persistant qui mesure sa file d'attente et l'occupation de ses workers"""
+    
+    def __init__(self, max_workers, thread_name_prefix=""):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.size = max_workers
+        self.stats_lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+    
+    def submit(self, fn, /, *args, **kwargs):
+        with self.stats_lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        return super().submit(self.run_task, fn, *args, **kwargs)
+    
+    def run_task(self, fn, *args, **kwargs):
+        with self.stats_lock:
+            self.queued -= 1
+            self.active += 1
+        start_time = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self.stats_lock:
+                self.active -= 1
+                self.completed += 1
+                self.busy_seconds += time.monotonic() - start_time
+    
+    def stats(self):
+        """Profondeur de file, workers occupés et taux d'occupation depuis le démarrage"""
+        with self.stats_lock:
+            uptime = time.monotonic() - self.started_at
+            return {
+                "workers": self.size,
+                "active": self.active,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "utilisation": round(self.active / self.size, 3),
+                "average_utilisation": round(self.busy_seconds / (self.size * uptime), 4) if uptime > 0 else 0.0
+            }
+
+# Pool partagé par toutes les sondes synchrones (taille : PROBE_MAX_WORKERS)
+probe_executor = ProbeExecutor(CONFIG["probe_max_workers"], thread_name_prefix="probe")
+# Boucle asyncio unique partagée par les sondes réseau
+probe_loop = asyncio.new_event_loop()
+probe_loop_thread = None
+probe_loop_lock = threading.Lock()
+# Réveille l'ordonnanceur quand une cible passe en mode rafale
+scheduler_wakeup = None
+# Connexions keep-alive de la boucle asyncio, par (schéma, hôte, port)
+async_connection_pools = {}
+# En-tête des segments du store, trois champs de 8 octets écrits séparément :
+# séquence (impaire pendant une écriture), longueur de l'enregistrement, segment retiré
+STORE_FIELD = struct.Struct("<Q")
+STORE_SEQ, STORE_LENGTH, STORE_RETIRED, STORE_HEADER_SIZE = 0, 8, 16, 24
+# Segments mmap ouverts en écriture par le processus de surveillance, par nom
+store_segments = {}
+# Segments lus par ce worker web : nom -> (segment, séquence, enregistrement désérialisé)
+store_cache = {}
+# Résolveurs DNS asynchrones, par serveur (None : résolveurs du système)
+dns_resolvers = {}
+# Cache des résolutions d'hôtes (respecte les TTL) et résolutions en cours
+dns_cache = {}
+dns_cache_pending = {}
+# Séries temporelles : échantillons en attente d'écriture et connexion SQLite
+timeseries_pending = []
+timeseries_db = None
+timeseries_lock = threading.Lock()
+TIMESERIES_TIERS = {"1m": 60, "1h": 3600, "1d": 86400}
+# Sessions requests keep-alive, par (schéma, hôte)
+http_sessions = {}
+http_sessions_lock = threading.Lock()
+# Réveille les clients /api/stream à chaque publication de snapshot
+stream_condition = threading.Condition()
+stream_slots = threading.BoundedSemaphore(CONFIG["max_streams"])
+# Dernier /api/refresh accepté par cible (hors mode web, où il est daté dans le store)
+refresh_claims = {}
+refresh_claims_lock = threading.Lock()
+# Époque de publication de ce processus : préfixe les versions publiées, qui repartent de 0 à chaque démarrage,
+# pour qu'un ETag, un ?since= ou un id SSE d'un processus précédent ne soit jamais reconnu
+publish_epoch = os.urandom(4).hex()
 app = Flask(__name__)
 CORS(app)
 # Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(CONFIG["log_file"], encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement : horodatage, niveau, thread et message"""
+    
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry, ensure_ascii=False)
+
+class RepeatFilter(logging.Filter):
+    """Ne laisse passer qu'une fois par fenêtre un avertissement ou une erreur identique.
+    
+    Le message suivant la fenêtre indique combien de répétitions ont été écartées.
+    """
+    
+    def __init__(self, window, level=logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self.lock = threading.Lock()
+        self.seen = {}  # (niveau, message) -> [dernier passage, répétitions écartées depuis]
+    
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        message = record.getMessage()
+        now = time.monotonic()
+        with self.lock:
+            entry = self.seen.get((record.levelno, message))
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            self.seen[(record.levelno, message)] = [now, 0]
+            if len(self.seen) > 1024:
+                self.seen = {key: value for key, value in self.seen.items() if now - value[0] < self.window}
+        record.suppressed = entry[1] if entry is not None else 0
+        if record.suppressed:
+            record.msg = f"{message} ({record.suppressed} identical messages suppressed)"
+            record.args = None
+        return True
+
+def setup_logging():
+    """Les threads des sondes ne font que mettre en file : un QueueListener formate et écrit.
+    
+    Le fichier (JSON, avec rotation) n'est pas ouvert par les workers web, qui se partageraient sa rotation.
+    """
+    handlers = []
+    if CONFIG["serve_mode"] != "web":
+        if CONFIG["log_rotate_when"]:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                CONFIG["log_file"], when=CONFIG["log_rotate_when"],
+                backupCount=CONFIG["log_backup_count"], encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                CONFIG["log_file"], maxBytes=CONFIG["log_max_bytes"],
+                backupCount=CONFIG["log_backup_count"], encoding='utf-8'
+            )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if CONFIG["log_stdout_format"] == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    handlers.append(stream_handler)
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatFilter(CONFIG["log_repeat_window"]))
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(CONFIG["log_level"])
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Vide la file avant l'arrêt du processus
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = setup_logging()
+
+# Métriques Prometheus, tenues à jour à la fin de chaque sonde : /metrics ne fait que les sérialiser
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS = {
+    "monitor_ping_latency_seconds": ("histogram", "TCP ping latency"),
+    "monitor_rpc_latency_seconds": ("histogram", "JSON-RPC batch latency on a warm connection"),
+    "monitor_tls_handshake_seconds": ("histogram", "TLS handshake duration"),
+    "monitor_dns_resolution_seconds": ("histogram", "Domain resolution duration"),
+    "monitor_http_request_seconds": ("histogram", "HTTP(S) request duration"),
+    "monitor_server_up": ("gauge", "Server status (1 online, 0 offline)"),
+    "monitor_port_up": ("gauge", "Port status (1 open, 0 otherwise)"),
+    "monitor_rpc_endpoint_up": ("gauge", "Outcome of the last attempt on an RPC endpoint (1 success, 0 failure)"),
+    "monitor_rpc_endpoint_health": ("gauge", "RPC endpoint health score (0 to 1)"),
+    "monitor_block_height": ("gauge", "Last block counted by the block follower"),
+    "monitor_chain_head_block": ("gauge", "Chain head block seen by the block follower"),
+    "monitor_chain_transactions": ("gauge", "Total transactions counted on the chain"),
+    "monitor_blocks_followed_total": ("counter", "Blocks read by the block follower"),
+    "monitor_transactions_followed_total": ("counter", "Transactions counted by the block follower"),
+    "monitor_probe_errors_total": ("counter", "Probes that failed or missed the cycle deadline"),
+    "monitor_probe_pool_workers": ("gauge", "Size of the shared probe worker pool"),
+    "monitor_probe_pool_active": ("gauge", "Busy probe workers"),
+    "monitor_probe_pool_queue_depth": ("gauge", "Probe tasks waiting for a worker")
+}
+metrics_lock = threading.Lock()
+# Nom -> {labels (tuple trié) -> valeur, ou [comptes par bucket..., +Inf, somme] pour un histogramme}
+metric_series = {name: {} for name in METRICS}
+
+def observe_latency(name, value_ms, **labels):
+    """Ajoute une mesure (ms) à un histogramme de latence (en secondes)"""
+    if value_ms is None:
+        return
+    value = value_ms / 1000
+    key = tuple(sorted(labels.items()))
+    with metrics_lock:
+        series = metric_series[name].get(key)
+        if series is None:
+            series = metric_series[name][key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        series[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        series[-1] += value
+
+def set_gauge(name, value, **labels):
+    with metrics_lock:
+        metric_series[name][tuple(sorted(labels.items()))] = value
+
+def inc_counter(name, amount=1, **labels):
+    key = tuple(sorted(labels.items()))
+    with metrics_lock:
+        metric_series[name][key] = metric_series[name].get(key, 0) + amount
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs) + "}"
+
+def render_metrics():
+    """Format texte Prometheus (0.0.4) : un passage sur les séries, sans recalcul"""
+    stats = probe_executor.stats()
+    set_gauge("monitor_probe_pool_workers", stats["workers"])
+    set_gauge("monitor_probe_pool_active", stats["active"])
+    set_gauge("monitor_probe_pool_queue_depth", stats["queue_depth"])
+    lines = []
+    with metrics_lock:
+        for name, (kind, description) in METRICS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in metric_series[name].items():
+                if kind != "histogram":
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), value[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
 def measure_overhead():
     """Mesure le temps de traitement local (overhead)"""
     # Mesure du temps pour une opération locale simple
@@ -102,28 +668,424 @@ def measure_overhead():
     end = time.perf_counter()
     return (end - start) * 1000  # en ms
 
-def tcp_ping(host, port=80, timeout=5):
+def get_http_session(url):
+    """Renvoie la session requests (pool keep-alive) associée à l'hôte de l'URL"""
+    parsed = urlparse(url)
+    key = (parsed.scheme, parsed.netloc)
+    with http_sessions_lock:
+        session = http_sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONFIG["http_pool_maxsize"])
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            http_sessions[key] = session
+    return session
+
+def start_probe_loop():
+    """Démarre (une seule fois) le thread de la boucle asyncio des sondes"""
+    global probe_loop_thread
+    with probe_loop_lock:
+        if probe_loop_thread is None:
+            probe_loop_thread = threading.Thread(target=probe_loop.run_forever, name="probe-loop", daemon=True)
+            probe_loop_thread.start()
+
+def submit_async(coro):
+    """Planifie une coroutine sur la boucle des sondes et renvoie un concurrent.futures.Future"""
+    start_probe_loop()
+    return asyncio.run_coroutine_threadsafe(coro, probe_loop)
+
+def run_async(coro, timeout=None):
+    """Exécute une coroutine sur la boucle des sondes depuis un thread synchrone"""
+    future = submit_async(coro)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+async def close_writer(writer):
+    writer.close()
+    try:
+        await asyncio.wait_for(writer.wait_closed(), 1)
+    except Exception:
+        pass
+
+async def async_tcp_connect(host, port, timeout=5):
+    """Ouvre puis ferme une connexion TCP et renvoie la durée du connect en ms (résolution DNS exclue)"""
+    ip = await resolve_ip(host)
+    start_time = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    elapsed = (time.perf_counter() - start_time) * 1000
+    await close_writer(writer)
+    return elapsed
+
+async def async_tls_handshake(host, port=443, timeout=10):
+    """Établit une session TLS et renvoie le certificat du serveur et la durée en ms"""
+    context = ssl.create_default_context()
+    ip = await resolve_ip(host)
+    start_time = time.perf_counter()
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(ip, port, ssl=context, server_hostname=host),
+        timeout
+    )
+    elapsed = (time.perf_counter() - start_time) * 1000
+    cert = writer.get_extra_info("peercert")
+    await close_writer(writer)
+    return cert, elapsed
+
+async def read_http_response(reader, method):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before HTTP response")
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ValueError(f"Invalid HTTP status line: {status_line!r}")
+    status_code = int(parts[1])
+    reusable = parts[0] == "HTTP/1.1"
+    
+    headers = CaseInsensitiveDict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip()] = value.strip()
+    
+    if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+        content = b""
+    elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Ignorer les éventuels trailers
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        content = b"".join(chunks)
+    elif "Content-Length" in headers:
+        content = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        # Corps délimité par la fermeture de la connexion
+        content = await reader.read()
+        reusable = False
+    
+    if headers.get("Connection", "").lower() == "close":
+        reusable = False
+    return status_code, headers, content, reusable
+
+async def acquire_connection(parsed, timeout, keep_alive=True, max_idle=None):
+    """Reprend une connexion inactive du pool ou en ouvre une nouvelle (durée du connect en ms, None si réutilisée)"""
+    secure = parsed.scheme == "https"
+    key = (parsed.scheme, parsed.hostname, parsed.port or (443 if secure else 80))
+    pool = async_connection_pools.setdefault(key, [])
+    
+    now = time.monotonic()
+    while keep_alive and pool:
+        reader, writer, idle_since = pool.pop()
+        if reader.at_eof() or writer.is_closing() or now - idle_since > (max_idle or CONFIG["http_keepalive_idle"]):
+            writer.close()
+            continue
+        return key, reader, writer, None
+    
+    # Connexion à l'IP en cache : la résolution ne compte pas dans connect_ms
+    ip = await resolve_ip(key[1])
+    start_time = time.perf_counter()
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(
+            ip, key[2],
+            ssl=ssl.create_default_context() if secure else None,
+            server_hostname=key[1] if secure else None
+        ),
+        timeout
+    )
+    return key, reader, writer, (time.perf_counter() - start_time) * 1000
+
+def release_connection(key, reader, writer):
+    pool = async_connection_pools.setdefault(key, [])
+    if len(pool) < CONFIG["http_pool_maxsize"]:
+        pool.append((reader, writer, time.monotonic()))
+    else:
+        writer.close()
+
+async def http_exchange(method, url, json_body=None, headers=None, timeout=10, keep_alive=True, max_idle=None):
+    """Un aller-retour HTTP sur une connexion du pool ; le connect a son propre timeout"""
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    
+    body = json.dumps(json_body).encode("utf-8") if json_body is not None else b""
+    request_headers = {
+        "Host": parsed.netloc,
+        "User-Agent": "Mozilla/5.0 (compatible; BasedAI-Monitor/1.0)",
+        "Accept": "*/*",
+        "Connection": "keep-alive" if keep_alive else "close"
+    }
+    if json_body is not None:
+        request_headers["Content-Type"] = "application/json"
+    if body or method in ("POST", "PUT"):
+        request_headers["Content-Length"] = str(len(body))
+    request_headers.update(headers or {})
+    head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items()) + "\r\n"
+    
+    for attempt in range(2):
+        key, reader, writer, connect_ms = await acquire_connection(
+            parsed, max(timeout, CONFIG["http_connect_timeout"]), keep_alive, max_idle
+        )
+        start_time = time.perf_counter()
+        try:
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            status_code, response_headers, content, reusable = await asyncio.wait_for(
+                read_http_response(reader, method), timeout
+            )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            # Une connexion keep-alive fermée par le serveur : on retente une fois à froid
+            if connect_ms is None and attempt == 0:
+                continue
+            raise
+        except BaseException:
+            writer.close()
+            raise
+        request_ms = (time.perf_counter() - start_time) * 1000
+        
+        if keep_alive and reusable:
+            release_connection(key, reader, writer)
+        else:
+            await close_writer(writer)
+        
+        return {
+            "status_code": status_code,
+            "headers": response_headers,
+            "content": content,
+            "connect_ms": connect_ms,
+            "request_ms": request_ms,
+            "peercert": writer.get_extra_info("peercert")
+        }
+
+async def async_http_request(method, url, json_body=None, headers=None, timeout=10, allow_redirects=True, keep_alive=True, max_idle=None):
+    """Requête HTTP/1.1 (GET/POST) sur la boucle asyncio, redirections comprises.
+    
+    elapsed_ms couvre toute la requête, connect_ms l'établissement de la connexion
+    (None si une connexion keep-alive a été réutilisée) et request_ms l'échange seul.
+    """
+    start_time = time.perf_counter()
+    history = []
+    first_hop = None
+    for _ in range(6):
+        response = await http_exchange(method, url, json_body, headers, timeout, keep_alive, max_idle)
+        if first_hop is None:
+            first_hop = response
+        if allow_redirects and response["status_code"] in (301, 302, 303, 307, 308) and "Location" in response["headers"]:
+            history.append(url)
+            url = urljoin(url, response["headers"]["Location"])
+            if response["status_code"] == 303:
+                method, json_body = "GET", None
+            continue
+        break
+    
+    response.update({
+        "url": url,
+        "history": history,
+        "reused": response["connect_ms"] is None,
+        # Certificat et durée de connexion (TCP + TLS) de l'URL demandée, avant redirection
+        "peercert": first_hop["peercert"],
+        "first_connect_ms": first_hop["connect_ms"],
+        "elapsed_ms": (time.perf_counter() - start_time) * 1000
+    })
+    return response
+
+async def async_rpc_batch(url, calls, timeout=10, max_idle=None):
+    """Lot JSON-RPC [(méthode, params)] en un seul aller-retour.
+    
+    Renvoie (réponse HTTP, résultats dans l'ordre des appels ou None) ; un appel sans résultat vaut None.
+    """
+    payload = [
+        {"jsonrpc": "2.0", "method": method, "params": params, "id": index}
+        for index, (method, params) in enumerate(calls, 1)
+    ]
+    response = await async_http_request("POST", url, json_body=payload, timeout=timeout, max_idle=max_idle)
+    results = None
+    if response["status_code"] == 200:
+        body = json.loads(response["content"].decode("utf-8"))
+        if isinstance(body, dict):
+            # Serveur sans support des lots : une seule réponse (erreur)
+            body = [body]
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        results = [by_id.get(index, {}).get("result") for index in range(1, len(calls) + 1)]
+    return response, results
+
+def parse_quantity(value):
+    """Quantité JSON-RPC hexadécimale (0x...) en entier, None si absente ou invalide"""
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+async def refresh_host_resolution(host, stale=None):
+    """Résout un hôte (requête A native, résolveur système en secours) et met le cache à jour"""
+    start_time = time.perf_counter()
+    try:
+        result = await dns_query(host, "A")
+        if result["status"] == "ok" and result["records"]:
+            ips, ttl, source = result["records"], result["ttl"], "dns"
+        else:
+            # /etc/hosts, noms locaux ou DNS bloqué : getaddrinfo du système
+            loop = asyncio.get_running_loop()
+            infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+            ips, ttl, source = list(dict.fromkeys(info[4][0] for info in infos)), CONFIG["dns_cache_min_ttl"], "system"
+    except Exception as e:
+        if stale is None:
+            raise
+        # Mieux vaut une IP expirée qu'une sonde en échec à cause du résolveur
+        logging.warning(f"DNS resolution failed for {host}, keeping cached IPs: {str(e)}")
+        stale["expires"] = time.monotonic() + CONFIG["dns_cache_min_ttl"]
+        return stale
+    
+    ttl = min(max(ttl, CONFIG["dns_cache_min_ttl"]), CONFIG["dns_cache_max_ttl"])
+    entry = {
+        "ips": ips,
+        "ttl": ttl,
+        "source": source,
+        "elapsed_ms": (time.perf_counter() - start_time) * 1000,
+        "resolved_at": time.time(),
+        "expires": time.monotonic() + ttl
+    }
+    dns_cache[host] = entry
+    return entry
+
+async def resolve_host(host):
+    """Résolution mise en cache selon le TTL ; les demandes simultanées partagent la même requête.
+    
+    Renvoie l'entrée du cache : ips, ttl, source, elapsed_ms et resolved_at.
+    """
+    entry = dns_cache.get(host)
+    if entry is not None and time.monotonic() < entry["expires"]:
+        return entry
+    
+    pending = dns_cache_pending.get(host)
+    if pending is None:
+        pending = asyncio.ensure_future(refresh_host_resolution(host, entry))
+        dns_cache_pending[host] = pending
+        pending.add_done_callback(lambda _: dns_cache_pending.pop(host, None))
+    return await asyncio.shield(pending)
+
+async def resolve_ip(host):
+    """IPv4 épinglée d'un hôte, depuis le cache de résolution"""
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    return (await resolve_host(host))["ips"][0]
+
+def get_dns_resolver(nameserver=None):
+    """Résolveur dnspython réutilisé (la configuration système n'est lue qu'une fois)"""
+    resolver = dns_resolvers.get(nameserver)
+    if resolver is None:
+        resolver = dns.asyncresolver.Resolver(configure=nameserver is None)
+        if nameserver is not None:
+            resolver.nameservers = [nameserver]
+        dns_resolvers[nameserver] = resolver
+    return resolver
+
+async def dns_query(name, rdtype, nameserver=None, timeout=None):
+    """Requête DNS native (UDP, TCP si tronquée) avec timeout propre.
+    
+    Renvoie un résultat structuré : status (ok, nodata, nxdomain, timeout, error),
+    records (texte de chaque enregistrement), ttl et elapsed_ms.
+    """
+    timeout = timeout or CONFIG["dns_query_timeout"]
+    result = {"name": name, "type": rdtype, "server": nameserver or "system", "records": [], "ttl": None}
+    start_time = time.perf_counter()
+    try:
+        answer = await get_dns_resolver(nameserver).resolve(name, rdtype, lifetime=timeout)
+        result["records"] = [rdata.to_text() for rdata in answer]
+        result["ttl"] = answer.rrset.ttl
+        result["status"] = "ok"
+    except dns.resolver.NXDOMAIN:
+        result["status"] = "nxdomain"
+    except dns.resolver.NoAnswer:
+        result["status"] = "nodata"
+    except dns.exception.Timeout:
+        result["status"] = "timeout"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    result["elapsed_ms"] = (time.perf_counter() - start_time) * 1000
+    return result
+
+def new_target_snapshot(target):
+    """Instantané du cycle : chaque requête HTTP/HTTPS/TLS n'y est faite qu'une fois"""
+    return {"target": target, "tasks": {}, "created": time.time()}
+
+async def fetch_snapshot_tls(snapshot):
+    """Certificat du domaine : repris de la requête HTTPS du cycle, sinon handshake dédié"""
+    target = snapshot["target"]
+    try:
+        response = await snapshot_fetch(snapshot, "https")
+        if response["peercert"] and response["first_connect_ms"] is not None:
+            return {"cert": response["peercert"], "handshake_ms": response["first_connect_ms"]}
+    except Exception:
+        pass
+    cert, handshake_ms = await async_tls_handshake(target['domain'], 443, CONFIG["snapshot_timeout"])
+    return {"cert": cert, "handshake_ms": handshake_ms, "dedicated": True}
+
+def observe_snapshot_fetch(target, kind, task):
+    """Durées de la requête HTTP(S) et du handshake TLS partagés du cycle"""
+    if task.cancelled() or task.exception() is not None:
+        return
+    result = task.result()
+    if kind == "tls":
+        # Un handshake repris de la requête HTTPS est déjà compté avec elle
+        if result.get("dedicated"):
+            observe_latency("monitor_tls_handshake_seconds", result["handshake_ms"], target=target["name"])
+    else:
+        observe_latency("monitor_http_request_seconds", result["elapsed_ms"], target=target["name"], scheme=kind)
+        if kind == "https" and result["first_connect_ms"] is not None:
+            observe_latency("monitor_tls_handshake_seconds", result["first_connect_ms"], target=target["name"])
+
+async def snapshot_fetch(snapshot, kind):
+    """Renvoie le résultat partagé de la requête `kind` ("http", "https" ou "tls") du cycle"""
+    target = snapshot["target"]
+    task = snapshot["tasks"].get(kind)
+    if task is None:
+        if kind == "http":
+            coro = async_http_request("GET", f"http://{target['domain']}", timeout=CONFIG["snapshot_timeout"])
+        elif kind == "https":
+            # Connexion neuve pour que le handshake TLS (et sa durée) serve aussi au certificat
+            coro = async_http_request("GET", f"https://{target['domain']}", timeout=CONFIG["snapshot_timeout"], keep_alive=False)
+        elif kind == "tls":
+            coro = fetch_snapshot_tls(snapshot)
+        else:
+            raise ValueError(f"Unknown snapshot fetch: {kind}")
+        task = asyncio.ensure_future(coro)
+        # Évite l'avertissement "exception never retrieved" si tous les consommateurs ont été annulés
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        task.add_done_callback(functools.partial(observe_snapshot_fetch, target, kind))
+        snapshot["tasks"][kind] = task
+    # shield : l'annulation d'un consommateur (échéance) n'annule pas la requête partagée
+    return await asyncio.shield(task)
+
+async def tcp_ping(host, port=80, timeout=5):
     """Mesure la latence TCP avec compensation de l'overhead"""
     try:
-        # Mesurer plusieurs fois et prendre la valeur la plus faible
-        measurements = []
+        # Mesurer plusieurs fois en parallèle (un seul RTT) et prendre la valeur la plus faible
         overhead = measure_overhead()
-        
-        for _ in range(3):  # 3 mesures pour fiabilité
-            try:
-                start_time = time.perf_counter()
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(timeout)
-                sock.connect((host, port))
-                sock.close()
-                end_time = time.perf_counter()
-                
-                # Calculer la latence brute et soustraire l'overhead
-                raw_latency = (end_time - start_time) * 1000
-                adjusted_latency = max(CONFIG["min_latency_ms"], raw_latency - overhead)
-                measurements.append(adjusted_latency)
-            except:
-                pass
+        raw_latencies = await asyncio.gather(
+            *[async_tcp_connect(host, port, timeout) for _ in range(3)],  # 3 mesures pour fiabilité
+            return_exceptions=True
+        )
+        # Soustraire l'overhead de chaque latence brute
+        measurements = [
+            max(CONFIG["min_latency_ms"], raw_latency - overhead)
+            for raw_latency in raw_latencies if not isinstance(raw_latency, BaseException)
+        ]
         
         if measurements:
             # Prendre la mesure la plus faible
@@ -132,27 +1094,20 @@ def tcp_ping(host, port=80, timeout=5):
             corrected_latency = best_latency * CONFIG["ping_correction_factor"]
             # S'assurer que la valeur est dans une plage raisonnable
             return max(CONFIG["min_latency_ms"], min(corrected_latency, CONFIG["max_latency_ms"]))
-    except:
+    except Exception:
         pass
     
     return None
 
-def ping_host():
+async def ping_host(target):
     """Mesure la latence avec plusieurs méthodes"""
     # Utiliser TCP ping par défaut
     if CONFIG["use_tcp_ping"]:
         try:
             # Tester plusieurs ports et prendre le meilleur résultat
             ports = [80, 443, 8545]
-            results = []
-            
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                futures = [executor.submit(tcp_ping, CONFIG['domain'], port, CONFIG["ping_timeout"]) for port in ports]
-                
-                for future in concurrent.futures.as_completed(futures):
-                    result = future.result()
-                    if result is not None:
-                        results.append(result)
+            results = await asyncio.gather(*[tcp_ping(target['domain'], port, CONFIG["ping_timeout"]) for port in ports])
+            results = [result for result in results if result is not None]
             
             if results:
                 ping_time = min(results)
@@ -164,12 +1119,19 @@ def ping_host():
     # Fallback sur le ping système
     try:
         param = '-n' if platform.system().lower() == 'windows' else '-c'
-        command = ['ping', param, '3', CONFIG['domain']]
-        response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        process = await asyncio.create_subprocess_exec(
+            'ping', param, '3', target['domain'],
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), CONFIG["ping_timeout"] * 3)
+        except asyncio.TimeoutError:
+            process.kill()
+            raise
         
-        if response.returncode == 0:
+        if process.returncode == 0:
             time_pattern = r'time[=<](\\d+\\.?\\d*)\\s*ms'
-            times = re.findall(time_pattern, response.stdout)
+            times = re.findall(time_pattern, stdout.decode(errors="replace"))
             
             if times:
                 times = sorted([float(t) for t in times])
@@ -186,242 +1148,284 @@ def ping_host():
     
     # Dernier recours: HTTP ping
     try:
-        start_time = time.perf_counter()
-        response = requests.get(f"http://{CONFIG['domain']}", timeout=5)
-        response_time = (time.perf_counter() - start_time) * 1000
+        response = await async_http_request("GET", f"http://{target['domain']}", timeout=5)
+        response_time = response["elapsed_ms"]
         
-        if response.status_code == 200:
+        if response["status_code"] == 200:
             # Appliquer le facteur de correction
             response_time = response_time * CONFIG["ping_correction_factor"]
             return {"status": "success", "time": response_time}
         else:
-            return {"status": "failed", "message": f"HTTP {response.status_code}"}
+            return {"status": "failed", "message": f"HTTP {response['status_code']}"}
             
     except Exception as e2:
         logging.error(f"HTTP ping failed: {str(e2)}")
         return {"status": "error", "message": "All ping methods failed"}
 
-def check_rpc_endpoint():
-    """Mesure la latence RPC avec compensation de l'overhead"""
-    rpc_payload = {"jsonrpc": "2.0", "method": "eth_chainId", "params": [], "id": 1}
-    
+# Méthodes envoyées dans chaque lot de la sonde RPC
+RPC_BATCH_METHODS = ["eth_chainId", "eth_blockNumber", "net_peerCount", "eth_syncing"]
+
+async def measure_rpc_endpoint(target, url):
+    """Envoie rpc_batches_per_cycle lots JSON-RPC sur la connexion chaude d'un endpoint.
+    
+    Renvoie (latences du cycle en ms, résultats du dernier lot valide, durée du connect à froid en ms).
+    Les latences excluent l'établissement de connexion et alimentent la fenêtre glissante de l'endpoint.
+    """
+    window = target["state"]["rpc_windows"].setdefault(url, deque(maxlen=CONFIG["rpc_latency_window"]))
+    samples = []
+    batch = None
+    cold_connect_ms = None
+    
+    for _ in range(CONFIG["rpc_batches_per_cycle"]):
+        try:
+            response, results = await async_rpc_batch(
+                url, [(method, []) for method in RPC_BATCH_METHODS],
+                timeout=CONFIG["rpc_batch_timeout"], max_idle=CONFIG["rpc_keepalive_idle"]
+            )
+            if response["connect_ms"] is not None:
+                cold_connect_ms = response["connect_ms"]
+            if results:
+                results = dict(zip(RPC_BATCH_METHODS, results))
+            if results and results["eth_chainId"] is not None:
+                samples.append(response["request_ms"])
+                observe_latency("monitor_rpc_latency_seconds", response["request_ms"], target=target["name"], endpoint=url)
+                batch = results
+        except Exception:
+            pass
+    
+    window.extend(samples)
+    return samples, batch, cold_connect_ms
+
+def rpc_endpoint_result(target, url, samples, batch, cold_connect_ms):
+    """Résultat d'une sonde RPC réussie : latence médiane du cycle et percentiles de la fenêtre"""
+    window = sorted(target["state"]["rpc_windows"][url])
+    latency = sorted(samples)[len(samples) // 2]
+    return {
+        "status": "online",
+        "chain_id": batch["eth_chainId"],
+        "block_number": parse_quantity(batch["eth_blockNumber"]),
+        "peer_count": parse_quantity(batch["net_peerCount"]),
+        "syncing": batch["eth_syncing"] not in [False, None],
+        "response_time": latency / 1000,
+        "response_time_ms": latency,
+        "latency_p50_ms": percentile(window, 0.5),
+        "latency_p95_ms": percentile(window, 0.95),
+        "latency_max_ms": window[-1],
+        "window_size": len(window),
+        "cold_connect_ms": cold_connect_ms
+    }
+
+def rpc_health(target, url):
+    return target["state"]["rpc_health"].setdefault(url, {"score": 1.0, "wins": 0, "successes": 0, "failures": 0})
+
+def record_rpc_outcome(target, url, success):
+    """Met à jour le score de santé d'un endpoint après une tentative terminée"""
+    health = rpc_health(target, url)
+    decay = CONFIG["rpc_health_decay"]
+    health["score"] = health["score"] * decay + (1 - decay if success else 0)
+    health["successes" if success else "failures"] += 1
+    set_gauge("monitor_rpc_endpoint_up", 1 if success else 0, target=target["name"], endpoint=url)
+    set_gauge("monitor_rpc_endpoint_health", round(health["score"], 4), target=target["name"], endpoint=url)
+
+def rpc_hedge_delay(target, url, requests=1):
+    """Délai avant de couvrir le primaire : son p95 récent (par requête) × rpc_hedge_factor, borné"""
+    window = sorted(target["state"]["rpc_windows"].get(url, ()))
+    if not window:
+        return CONFIG["rpc_hedge_default_delay"]
+    delay = percentile(window, 0.95) / 1000 * requests * CONFIG["rpc_hedge_factor"]
+    return min(max(delay, CONFIG["rpc_hedge_min_delay"]), CONFIG["rpc_hedge_max_delay"])
+
+async def hedged_rpc(target, attempt, hedge_delay, fallbacks=None):
+    """Course couverte entre le RPC principal et ses fallbacks (par défaut tous ceux de la cible).
+    
+    Le primaire part seul ; s'il n'a pas abouti après hedge_delay (ou dès son échec), les
+    fallbacks sains sont lancés ensemble, puis les fallbacks dégradés si tous échouent.
+    Le premier résultat valide gagne et les autres tentatives sont annulées.
+    Renvoie (endpoint gagnant, résultat, fallbacks lancés) ; (None, None, True) si tout échoue.
+    """
+    primary = target["rpc_url"]
+    if fallbacks is None:
+        fallbacks = target["fallback_rpc_urls"]
+    fallbacks = sorted(fallbacks, key=lambda url: -rpc_health(target, url)["score"])
+    threshold = CONFIG["rpc_health_demote_threshold"]
+    waves = [wave for wave in [
+        [primary],
+        [url for url in fallbacks if rpc_health(target, url)["score"] >= threshold],
+        [url for url in fallbacks if rpc_health(target, url)["score"] < threshold]
+    ] if wave]
+    
+    loop = asyncio.get_running_loop()
+    urls = {}
+    pending = set()
     try:
-        # Mesurer plusieurs fois et prendre la valeur la plus faible
-        measurements = []
-        overhead = measure_overhead()
-        
-        for _ in range(3):  # 3 mesures pour fiabilité
-            try:
-                start_time = time.perf_counter()
-                response = requests.post(
-                    CONFIG["rpc_url"], 
-                    json=rpc_payload, 
-                    timeout=0.3,  # Timeout court pour une mesure précise
-                    headers={'User-Agent': 'Mozilla/5.0 (compatible; BasedAI-Monitor/1.0)'}
-                )
-                end_time = time.perf_counter()
-                
-                if response.status_code == 200:
-                    # Calculer la latence brute et soustraire l'overhead
-                    raw_latency = (end_time - start_time) * 1000
-                    adjusted_latency = max(CONFIG["min_latency_ms"], raw_latency - overhead)
-                    measurements.append(adjusted_latency)
-            except:
-                pass
-        
-        if measurements:
-            # Prendre la mesure la plus faible
-            best_latency = min(measurements)
-            # Appliquer le facteur de correction
-            corrected_latency = best_latency * CONFIG["rpc_correction_factor"]
-            # S'assurer que la valeur est dans une plage raisonnable
-            final_latency = max(CONFIG["min_latency_ms"], min(corrected_latency, CONFIG["max_latency_ms"]))
+        for index, wave in enumerate(waves):
+            if index == 1:
+                logging.info(f"Hedging RPC for {target['name']} with {len(wave)} fallback(s)")
+            wave_tasks = set()
+            for url in wave:
+                task = asyncio.ensure_future(attempt(url))
+                urls[task] = url
+                wave_tasks.add(task)
+            pending |= wave_tasks
             
-            logging.info(f"RPC response time: {final_latency:.1f} ms (raw: {best_latency:.1f} ms)")
-            
-            result = response.json()
-            if "result" in result:
-                return {
-                    "status": "online",
-                    "chain_id": result["result"],
-                    "response_time": final_latency / 1000,
-                    "response_time_ms": final_latency
-                }
-            else:
-                logging.error(f"Invalid RPC response: {result}")
-                return {"status": "offline", "message": "Invalid RPC response"}
-        else:
-            logging.error("All RPC measurements failed")
-            return {"status": "offline", "message": "All RPC measurements failed"}
-            
-    except requests.exceptions.RequestException as e:
-        logging.error(f"RPC request failed: {str(e)}")
-        
-        # Essayer avec les fallback RPCs
-        for fallback_url in CONFIG["fallback_rpc_urls"]:
-            try:
-                logging.info(f"Trying fallback RPC: {fallback_url}")
-                measurements = []
-                
-                for _ in range(3):
-                    try:
-                        start_time = time.perf_counter()
-                        response = requests.post(
-                            fallback_url, 
-                            json=rpc_payload, 
-                            timeout=0.3,
-                            headers={'User-Agent': 'Mozilla/5.0 (compatible; BasedAI-Monitor/1.0)'}
-                        )
-                        end_time = time.perf_counter()
-                        
-                        if response.status_code == 200:
-                            raw_latency = (end_time - start_time) * 1000
-                            adjusted_latency = max(CONFIG["min_latency_ms"], raw_latency - overhead)
-                            measurements.append(adjusted_latency)
-                    except:
-                        pass
-                
-                if measurements:
-                    best_latency = min(measurements)
-                    corrected_latency = best_latency * CONFIG["rpc_correction_factor"]
-                    final_latency = max(CONFIG["min_latency_ms"], min(corrected_latency, CONFIG["max_latency_ms"]))
-                    
-                    logging.info(f"Fallback RPC response time: {final_latency:.1f} ms")
-                    
-                    result = response.json()
-                    if "result" in result:
-                        return {
-                            "status": "online",
-                            "chain_id": result["result"],
-                            "response_time": final_latency / 1000,
-                            "response_time_ms": final_latency,
-                            "source": fallback_url
-                        }
-            except requests.exceptions.RequestException as fallback_error:
-                logging.error(f"Fallback RPC failed: {fallback_url} - {str(fallback_error)}")
-                continue
-        
+            # Attendre un gagnant ; la vague suivante part au délai de couverture (s'il y en a une) ou quand cette vague a échoué
+            deadline = loop.time() + hedge_delay if index == 0 and len(waves) > 1 else None
+            while pending and (wave_tasks & pending or index == len(waves) - 1):
+                timeout = None if deadline is None else max(0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    url = urls[task]
+                    if not task.cancelled() and task.exception() is None and task.result() is not None:
+                        record_rpc_outcome(target, url, True)
+                        rpc_health(target, url)["wins"] += 1
+                        return url, task.result(), index > 0 or len(urls) > 1
+                    if not task.cancelled():
+                        logging.error(f"RPC attempt failed on {url}: {task.exception() or 'invalid response'}")
+                    record_rpc_outcome(target, url, False)
+        return None, None, True
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def check_rpc_endpoint(target):
+    """Mesure la latence RPC par lots JSON-RPC sur une connexion keep-alive, couverte par les fallbacks"""
+    async def attempt(url):
+        samples, batch, cold_connect_ms = await measure_rpc_endpoint(target, url)
+        if not samples:
+            raise ConnectionError("All RPC measurements failed")
+        target["state"]["endpoint_chains"][url] = chain_id_of(batch["eth_chainId"])
+        return rpc_endpoint_result(target, url, samples, batch, cold_connect_ms)
+    
+    delay = rpc_hedge_delay(target, target["rpc_url"], CONFIG["rpc_batches_per_cycle"])
+    url, result, hedged = await hedged_rpc(target, attempt, delay)
+    if result is None:
         return {"status": "offline", "message": "All RPC endpoints failed"}
+    
+    result["hedged"] = hedged
+    if url != target["rpc_url"]:
+        result["source"] = url
+        logging.info(f"Fallback RPC response time: {result['response_time_ms']:.1f} ms ({url})")
+    else:
+        logging.info(
+            f"RPC response time: {result['response_time_ms']:.1f} ms "
+            f"(p50: {result['latency_p50_ms']:.1f} ms, p95: {result['latency_p95_ms']:.1f} ms over {result['window_size']})"
+        )
+    return result
 
 # Le reste du code reste identique...
-def check_ports_alt():
-    port_results = {}
-    
+async def scan_port(ip, port, timeout):
+    """Connect TCP non bloquant sur un port : open, closed (refusé), filtered (sans réponse) ou unreachable"""
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    start_time = time.perf_counter()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        return {"status": "open", "latency_ms": round((time.perf_counter() - start_time) * 1000, 2)}
+    except ConnectionRefusedError:
+        return {"status": "closed", "latency_ms": round((time.perf_counter() - start_time) * 1000, 2)}
+    except asyncio.TimeoutError:
+        return {"status": "filtered", "latency_ms": None}
+    except OSError as e:
+        if e.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH):
+            return {"status": "unreachable", "latency_ms": None}
+        return {"status": "error", "latency_ms": None, "error": str(e)}
+    finally:
+        sock.close()
+
+async def scan_ports(host, ports, timeout=None):
+    """Scanne tous les ports en parallèle sur la boucle asyncio (epoll) : durée bornée par un seul timeout"""
+    timeout = timeout or CONFIG["port_scan_timeout"]
+    try:
+        ip = await resolve_ip(host)
+    except Exception as e:
+        logging.error(f"Error resolving {host} for port scan: {str(e)}")
+        return {port: {"status": "unknown", "latency_ms": None, "error": str(e)} for port in ports}
+    results = await asyncio.gather(*[scan_port(ip, port, timeout) for port in ports])
+    return dict(zip(ports, results))
+
+async def check_ports_alt(target):
+    """Statut et latence de connexion de chaque port de la cible"""
     if CONFIG["disable_port_checks"]:
         logging.info("Port checks disabled, using default values")
-        for port in CONFIG["ports_to_check"]:
-            if port in [80, 443]:
-                port_results[port] = "open"
-            else:
-                port_results[port] = "unknown"
-        return port_results
-    
-    if 80 in CONFIG["ports_to_check"]:
-        try:
-            response = requests.get(f"http://{CONFIG['domain']}", timeout=10)
-            port_results[80] = "open" if response.status_code < 500 else "closed"
-        except:
-            port_results[80] = "closed"
-    
-    if 443 in CONFIG["ports_to_check"]:
-        try:
-            response = requests.get(f"https://{CONFIG['domain']}", timeout=10)
-            port_results[443] = "open" if response.status_code < 500 else "closed"
-        except:
-            port_results[443] = "closed"
-    
-    for port in CONFIG["ports_to_check"]:
-        if port not in [80, 443]:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(10)
-                result = sock.connect_ex((CONFIG["domain"], port))
-                sock.close()
-                
-                if result == 0:
-                    port_results[port] = "open"
-                else:
-                    port_results[port] = "closed"
-                    
-            except Exception as e:
-                logging.error(f"Error checking port {port}: {str(e)}")
-                try:
-                    if port in [8080, 8000, 3000, 5000]:
-                        response = requests.get(f"http://{CONFIG['domain']}:{port}", timeout=10)
-                        port_results[port] = "open" if response.status_code < 500 else "closed"
-                    else:
-                        port_results[port] = "unknown"
-                except:
-                    port_results[port] = "unknown"
+        return {
+            port: {"status": "open" if port in [80, 443] else "unknown", "latency_ms": None}
+            for port in target["ports_to_check"]
+        }
     
+    port_results = await scan_ports(target["domain"], target["ports_to_check"])
+    logging.info(
+        f"Port scan of {target['domain']}: "
+        + ", ".join(f"{port} {result['status']}" for port, result in port_results.items())
+    )
     return port_results
 
-def get_ip_info():
+async def get_ip_info(target):
     try:
-        ip = socket.gethostbyname(CONFIG["domain"])
+        ip = await resolve_ip(target["domain"])
         return ip
     except:
         return "N/A"
 
-def get_http_info():
+async def get_http_info(target, snapshot):
     try:
-        response = requests.get(f"http://{CONFIG['domain']}", timeout=5)
-        server = response.headers.get("Server", "Unknown")
-        status_code = response.status_code
+        response = await snapshot_fetch(snapshot, "http")
+        server = response["headers"].get("Server", "Unknown")
+        status_code = response["status_code"]
         
         return f"{server} ({status_code})"
-    except:
+    except Exception:
         return "N/A"
 
-def get_ssl_info():
+async def get_ssl_info(target, snapshot):
     ssl_info = {}
     try:
-        context = ssl.create_default_context()
-        with socket.create_connection((CONFIG['domain'], 443)) as sock:
-            with context.wrap_socket(sock, server_hostname=CONFIG['domain']) as ssock:
-                cert = ssock.getpeercert()
-                ssl_info['issuer'] = dict(x[0] for x in cert['issuer'])
-                ssl_info['subject'] = dict(x[0] for x in cert['subject'])
-                ssl_info['version'] = cert.get('version', 'N/A')
-                ssl_info['serialNumber'] = cert.get('serialNumber', 'N/A')
-                ssl_info['notBefore'] = cert.get('notBefore', 'N/A')
-                ssl_info['notAfter'] = cert.get('notAfter', 'N/A')
-                ssl_info['signatureAlgorithm'] = cert.get('signatureAlgorithm', 'N/A')
-                
-                expire_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                days_left = (expire_date - datetime.now()).days
-                ssl_info['days_left'] = days_left
+        tls = await snapshot_fetch(snapshot, "tls")
+        cert, handshake_ms = tls["cert"], tls["handshake_ms"]
+        ssl_info['issuer'] = dict(x[0] for x in cert['issuer'])
+        ssl_info['subject'] = dict(x[0] for x in cert['subject'])
+        ssl_info['version'] = cert.get('version', 'N/A')
+        ssl_info['serialNumber'] = cert.get('serialNumber', 'N/A')
+        ssl_info['notBefore'] = cert.get('notBefore', 'N/A')
+        ssl_info['notAfter'] = cert.get('notAfter', 'N/A')
+        ssl_info['signatureAlgorithm'] = cert.get('signatureAlgorithm', 'N/A')
+        
+        expire_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+        days_left = (expire_date - datetime.now()).days
+        ssl_info['days_left'] = days_left
+        ssl_info['handshake_ms'] = round(handshake_ms, 2)
     except Exception as e:
         ssl_info['error'] = str(e)
     
     return ssl_info
 
-def get_security_info():
+async def get_security_info(target, snapshot):
     try:
-        response = requests.get(f"https://{CONFIG['domain']}", timeout=5)
+        response = await snapshot_fetch(snapshot, "https")
+        response_headers = response["headers"]
         
         security_headers = []
-        if response.headers.get("Strict-Transport-Security"):
+        if response_headers.get("Strict-Transport-Security"):
             security_headers.append("HSTS")
-        if response.headers.get("Content-Security-Policy"):
+        if response_headers.get("Content-Security-Policy"):
             security_headers.append("CSP")
-        if response.headers.get("X-Content-Type-Options"):
+        if response_headers.get("X-Content-Type-Options"):
             security_headers.append("XCTO")
-        if response.headers.get("X-Frame-Options"):
+        if response_headers.get("X-Frame-Options"):
             security_headers.append("XFO")
-        if response.headers.get("X-XSS-Protection"):
+        if response_headers.get("X-XSS-Protection"):
             security_headers.append("XSS")
         
         cert_info = ""
         try:
-            context = ssl.create_default_context()
-            with socket.create_connection((CONFIG['domain'], 443)) as sock:
-                with context.wrap_socket(sock, server_hostname=CONFIG['domain']) as ssock:
-                    cert = ssock.getpeercert()
-                    issuer = dict(x[0] for x in cert['issuer'])
-                    expire_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                    days_left = (expire_date - datetime.now()).days
-                    cert_info = f"Certificate: {issuer.get('organizationName', 'Unknown')} - Expires in {days_left} days"
+            cert = (await snapshot_fetch(snapshot, "tls"))["cert"]
+            issuer = dict(x[0] for x in cert['issuer'])
+            expire_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+            days_left = (expire_date - datetime.now()).days
+            cert_info = f"Certificate: {issuer.get('organizationName', 'Unknown')} - Expires in {days_left} days"
         except Exception as e:
             cert_info = f"Certificate error: {str(e)}"
         
@@ -432,11 +1436,11 @@ def get_security_info():
     except Exception as e:
         return f"Error: {str(e)}"
 
-def get_main_domain_info():
+def get_main_domain_info(target):
     result = {"ip": "N/A", "redirect": "N/A"}
     
     try:
-        ip = socket.gethostbyname(CONFIG["main_domain"])
+        ip = run_async(resolve_ip(target["main_domain"]), CONFIG["dns_query_timeout"] * 2)
         result["ip"] = ip
     except Exception as e:
         logging.error(f"Error getting main domain IP: {str(e)}")
@@ -448,8 +1452,8 @@ def get_main_domain_info():
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(
-                f"http://{CONFIG['main_domain']}", 
+            response = get_http_session(f"http://{target['main_domain']}").get(
+                f"http://{target['main_domain']}", 
                 timeout=CONFIG["http_request_timeout"], 
                 headers=headers, 
                 allow_redirects=True
@@ -457,8 +1461,8 @@ def get_main_domain_info():
             
             if response.history:
                 final_url = response.url
-                if CONFIG["domain"] in final_url:
-                    result["redirect"] = f"→ {CONFIG['domain']}"
+                if target["domain"] in final_url:
+                    result["redirect"] = f"→ {target['domain']}"
                 else:
                     result["redirect"] = f"→ {final_url}"
                 break
@@ -473,10 +1477,11 @@ def get_main_domain_info():
     
     return result
 
-def verify_ip_consistency():
+async def verify_ip_consistency(target):
     try:
-        subdomain_ip = socket.gethostbyname(CONFIG["domain"])
-        main_domain_ip = socket.gethostbyname(CONFIG["main_domain"])
+        subdomain_ip, main_domain_ip = await asyncio.gather(
+            resolve_ip(target["domain"]), resolve_ip(target["main_domain"])
+        )
         
         if subdomain_ip == main_domain_ip:
             logging.info(f"IP consistency verified: {subdomain_ip}")
@@ -488,8 +1493,8 @@ def verify_ip_consistency():
         logging.error(f"Error verifying IP consistency: {str(e)}")
         return False
 
-def get_dns_serial():
-    global last_dns_serial
+def get_dns_serial(target):
+    state = target["state"]
     
     force_dns_checks = os.environ.get('FORCE_DNS_CHECKS', 'false').lower() == 'true'
     
@@ -497,19 +1502,19 @@ def get_dns_serial():
         logging.info("DNS checks disabled, using default serial")
         today = datetime.now()
         date_serial = today.strftime("%Y%m%d")
-        last_dns_serial = date_serial
+        state["last_dns_serial"] = date_serial
         return date_serial
     
     try:
         try:
-            domain = CONFIG["main_domain"]
+            domain = target["main_domain"]
             url = f"https://dns.google/resolve?name={domain}&type=SOA"
             
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             }
             
-            response = requests.get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
+            response = get_http_session(url).get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
             if response.status_code == 200:
                 data = response.json()
                 if "Answer" in data:
@@ -519,13 +1524,13 @@ def get_dns_serial():
                             if len(soa_data) >= 3:
                                 serial = soa_data[2]
                                 logging.info(f"DNS serial found using Google DNS API: {serial}")
-                                last_dns_serial = serial
+                                state["last_dns_serial"] = serial
                                 return serial
         except Exception as e:
             logging.error(f"Error with Google DNS API: {str(e)}")
         
         try:
-            domain = CONFIG["main_domain"]
+            domain = target["main_domain"]
             url = f"https://cloudflare-dns.com/dns-query?name={domain}&type=SOA"
             
             headers = {
@@ -533,7 +1538,7 @@ def get_dns_serial():
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             }
             
-            response = requests.get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
+            response = get_http_session(url).get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
             if response.status_code == 200:
                 data = response.json()
                 if "Answer" in data:
@@ -543,20 +1548,20 @@ def get_dns_serial():
                             if len(soa_data) >= 3:
                                 serial = soa_data[2]
                                 logging.info(f"DNS serial found using Cloudflare DNS API: {serial}")
-                                last_dns_serial = serial
+                                state["last_dns_serial"] = serial
                                 return serial
         except Exception as e:
             logging.error(f"Error with Cloudflare DNS API: {str(e)}")
         
         try:
-            domain = CONFIG["main_domain"]
+            domain = target["main_domain"]
             url = f"https://www.whois.com/whois/{domain}"
             
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             }
             
-            response = requests.get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
+            response = get_http_session(url).get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
             if response.status_code == 200:
                 serial_patterns = [
                     r'Registry Expiry Date:[^0-9]*([0-9]{4}-[0-9]{2}-[0-9]{2})',
@@ -572,13 +1577,13 @@ def get_dns_serial():
                         date_obj = datetime.strptime(date_str, "%Y-%m-%d")
                         serial = date_obj.strftime("%Y%m%d")
                         logging.info(f"DNS serial found using Whois API: {serial}")
-                        last_dns_serial = serial
+                        state["last_dns_serial"] = serial
                         return serial
         except Exception as e:
             logging.error(f"Error with Whois API: {str(e)}")
         
         try:
-            domain = CONFIG["main_domain"]
+            domain = target["main_domain"]
             url = f"https://jsonwhoisapi.com/api/v1/whois?domainName={domain}"
             
             headers = {
@@ -586,7 +1591,7 @@ def get_dns_serial():
                 "Content-Type": "application/json"
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = get_http_session(url).get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if "WhoisRecord" in data and "registryData" in data["WhoisRecord"]:
@@ -598,7 +1603,7 @@ def get_dns_serial():
                             date_obj = datetime.strptime(exp_date.split("T")[0], "%Y-%m-%d")
                             serial = date_obj.strftime("%Y%m%d")
                             logging.info(f"DNS serial found using JSON Whois API: {serial}")
-                            last_dns_serial = serial
+                            state["last_dns_serial"] = serial
                             return serial
         except Exception as e:
             logging.error(f"Error with JSON Whois API: {str(e)}")
@@ -609,21 +1614,21 @@ def get_dns_serial():
     today = datetime.now()
     date_serial = today.strftime("%Y%m%d")
     logging.warning(f"All DNS methods failed, using date-based serial: {date_serial}")
-    last_dns_serial = date_serial
+    state["last_dns_serial"] = date_serial
     return date_serial
 
-def get_txt_records():
+async def get_txt_records(target):
     if CONFIG["disable_dns_checks"]:
         logging.info("DNS checks disabled, using default TXT records")
         return []
     
     try:
-        url = f"https://dns.google/resolve?name={CONFIG['domain']}&type=TXT"
+        url = f"https://dns.google/resolve?name={target['domain']}&type=TXT"
         headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=CONFIG["dns_api_timeout"])
+        response = await async_http_request("GET", url, headers=headers, timeout=CONFIG["dns_api_timeout"])
         
-        if response.status_code == 200:
-            data = response.json()
+        if response["status_code"] == 200:
+            data = json.loads(response["content"])
             if "Answer" in data:
                 txt_records = []
                 for answer in data["Answer"]:
@@ -637,146 +1642,226 @@ def get_txt_records():
     except Exception as e:
         logging.error(f"Error with Google DNS API: {str(e)}")
     
-    try:
-        import dns.resolver
-        answers = dns.resolver.resolve(CONFIG["domain"], 'TXT')
-        txt_records = [str(rdata).replace('"', '') for rdata in answers]
+    result = await dns_query(target["domain"], "TXT")
+    if result["status"] == "ok":
+        txt_records = [record.replace('"', '') for record in result["records"]]
         if txt_records:
-            logging.info(f"TXT Records found using dns.resolver: {txt_records}")
+            logging.info(f"TXT Records found using native DNS: {txt_records}")
             return txt_records
-    except ImportError:
-        pass
-    except Exception as e:
-        logging.error(f"Error with dns.resolver: {str(e)}")
-    
-    try:
-        command = ['nslookup', '-type=TXT', CONFIG["domain"]]
-        response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        if response.returncode == 0:
-            txt_records = []
-            lines = response.stdout.split('\n')
-            
-            for line in lines:
-                if 'text =' in line or 'text=' in line:
-                    txt_match = re.search(r'"([^"]*)"', line)
-                    if txt_match:
-                        txt_records.append(txt_match.group(1))
-            
-            if txt_records:
-                logging.info(f"TXT Records found using nslookup: {txt_records}")
-                return txt_records
-    except Exception as e:
-        logging.error(f"Error with nslookup: {str(e)}")
+    elif result["status"] in ["timeout", "error"]:
+        logging.error(f"Error with native DNS TXT query: {result.get('error', result['status'])}")
     
     logging.info("No TXT records found")
     return []
 
-def get_dns_records():
+async def get_dns_records(target):
     dns_records = {}
     
     if CONFIG["disable_dns_checks"]:
         logging.info("DNS checks disabled, using default DNS records")
         return {"A": [], "MX": [], "NS": []}
     
-    try:
-        command = ['nslookup', '-type=A', CONFIG["domain"]]
-        response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        if response.returncode == 0:
-            a_records = []
-            lines = response.stdout.split('\n')
-            for line in lines:
-                if 'Address:' in line and CONFIG["domain"] not in line:
-                    ip_match = re.search(r'Address:\s*(\d+\.\d+\.\d+\.\d+)', line)
-                    if ip_match:
-                        a_records.append(ip_match.group(1))
-            dns_records['A'] = a_records
-    except Exception as e:
-        logging.error(f"Error fetching A records: {str(e)}")
+    # Les trois types sont interrogés en parallèle
+    record_types = ["A", "MX", "NS"]
+    results = await asyncio.gather(*(dns_query(target["domain"], rdtype) for rdtype in record_types))
     
-    try:
-        command = ['nslookup', '-type=MX', CONFIG["domain"]]
-        response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        if response.returncode == 0:
-            mx_records = []
-            lines = response.stdout.split('\n')
-            for line in lines:
-                if 'mail exchanger' in line:
-                    mx_match = re.search(r'mail exchanger = (.+)', line)
-                    if mx_match:
-                        mx_records.append(mx_match.group(1))
-            dns_records['MX'] = mx_records
-    except Exception as e:
-        logging.error(f"Error fetching MX records: {str(e)}")
-    
-    try:
-        command = ['nslookup', '-type=NS', CONFIG["domain"]]
-        response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        if response.returncode == 0:
-            ns_records = []
-            lines = response.stdout.split('\n')
-            for line in lines:
-                if 'nameserver' in line:
-                    ns_match = re.search(r'nameserver = (.+)', line)
-                    if ns_match:
-                        ns_records.append(ns_match.group(1))
-            dns_records['NS'] = ns_records
-    except Exception as e:
-        logging.error(f"Error fetching NS records: {str(e)}")
+    for rdtype, result in zip(record_types, results):
+        if result["status"] in ["ok", "nodata"]:
+            dns_records[rdtype] = result["records"]
+        else:
+            logging.error(f"Error fetching {rdtype} records: {result.get('error', result['status'])}")
     
     return dns_records
 
-def get_network_info():
-    network_info = {}
-    
-    dns_servers = ['8.8.8.8', '1.1.1.1', '208.67.222.222']
+async def check_dns_connectivity(target):
+    dns_servers = CONFIG["dns_check_servers"]
     dns_results = {}
     
-    for dns in dns_servers:
-        try:
-            response = subprocess.run(['nslookup', CONFIG["domain"], dns], 
-                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            if response.returncode == 0:
-                dns_results[dns] = "OK"
-            else:
-                dns_results[dns] = "Failed"
-        except:
-            dns_results[dns] = "Error"
+    # Une requête A par résolveur, toutes en parallèle
+    results = await asyncio.gather(*(dns_query(target["domain"], "A", nameserver=server) for server in dns_servers))
     
-    network_info['dns_connectivity'] = dns_results
+    for server, result in zip(dns_servers, results):
+        if result["status"] in ["ok", "nodata"]:
+            dns_results[server] = "OK"
+        elif result["status"] == "error":
+            dns_results[server] = "Error"
+        else:
+            dns_results[server] = "Failed"
     
-    endpoints = [
-        f"https://{CONFIG['domain']}",
-        f"http://{CONFIG['domain']}",
-        CONFIG["rpc_url"]
-    ]
+    return dns_results
+
+async def get_network_info(target, snapshot):
+    network_info = {}
+    
+    network_info['dns_connectivity'] = await check_dns_connectivity(target)
     
     latency_results = {}
-    for endpoint in endpoints:
+    # Les URL du domaine réutilisent les requêtes de l'instantané du cycle
+    for kind in ["https", "http"]:
+        endpoint = f"{kind}://{target['domain']}"
         try:
-            start_time = time.time()
-            response = requests.get(endpoint, timeout=5)
-            latency = (time.time() - start_time) * 1000
-            latency_results[endpoint] = f"{latency:.2f}ms"
-        except:
+            response = await snapshot_fetch(snapshot, kind)
+            latency_results[endpoint] = f"{response['elapsed_ms']:.2f}ms"
+        except Exception:
             latency_results[endpoint] = "Failed"
     
+    if target["rpc_url"]:
+        try:
+            response = await async_http_request("GET", target["rpc_url"], timeout=5)
+            latency_results[target["rpc_url"]] = f"{response['elapsed_ms']:.2f}ms"
+        except Exception:
+            latency_results[target["rpc_url"]] = "Failed"
+    
     network_info['endpoint_latency'] = latency_results
     
     return network_info
 
-def get_latest_transactions():
-    global last_block_number, last_tx_count
+def format_tx_count(count):
+    """Nombre de transactions lisible (94.079K, 1.952M)"""
+    if count >= 1000000:
+        return f"{count/1000000:.3f}M"
+    elif count >= 1000:
+        return f"{count/1000:.3f}K"
+    return str(count)
+
+async def fetch_blocks(url, numbers):
+    """Blocs d'une plage en un seul lot JSON-RPC, sans le corps des transactions (hashes seulement)"""
+    calls = [("eth_getBlockByNumber", [hex(number), False]) for number in numbers]
+    response, blocks = await async_rpc_batch(url, calls, timeout=CONFIG["http_request_timeout"])
+    if blocks is None or any(block is None for block in blocks):
+        raise ValueError(f"Incomplete block batch (HTTP {response['status_code']})")
+    return blocks
+
+async def fetch_chain_head(target, url):
+    """Identifiant de chaîne et bloc de tête d'un endpoint, qui doit être sur la chaîne suivie.
+    
+    Seul le RPC principal peut fixer la chaîne suivie (à défaut d'expected_chain_id) : avant cela,
+    un fallback est refusé.
+    """
+    response, results = await async_rpc_batch(
+        url, [("eth_chainId", []), ("eth_blockNumber", [])], timeout=CONFIG["http_request_timeout"]
+    )
+    if not results or None in results:
+        raise ValueError(f"Invalid chain head response (HTTP {response['status_code']})")
+    state = target["state"]
+    chain_id, head = chain_id_of(results[0]), parse_quantity(results[1])
+    state["endpoint_chains"][url] = chain_id
+    if state["chain_id"] is None:
+        if url != target["rpc_url"]:
+            raise ValueError("Followed chain is not pinned yet, only the primary RPC can pin it")
+        if state["checkpoint_chain_id"] not in [None, chain_id]:
+            logging.warning(f"Checkpoint of {target['name']} is on chain {state['checkpoint_chain_id']}, restarting at the head")
+            state["last_block_number"] = 0
+        state["chain_id"] = chain_id
+        logging.info(f"Following chain {chain_id} of {target['name']}")
+    if chain_id != state["chain_id"]:
+        raise ValueError(f"Endpoint is on chain {chain_id}, following {state['chain_id']}")
+    return chain_id, head
+
+async def identify_chain(target, url):
+    """Relève la chaîne d'un fallback pas encore vu, hors course : il n'y entre que s'il est sur la chaîne suivie"""
+    try:
+        await fetch_chain_head(target, url)
+    except Exception as e:
+        logging.debug(f"Chain check of {url} failed: {str(e)}")
+
+async def follow_blocks(target, url, chain_id, head):
+    """Compte les transactions de chaque bloc depuis le checkpoint jusqu'au bloc de tête.
+    
+    Sans checkpoint, le suivi démarre au bloc de tête. Au plus block_follow_max_blocks
+    blocs sont lus par appel ; le checkpoint avance lot par lot.
+    """
+    state = target["state"]
+    start = state["last_block_number"] + 1 if state["last_block_number"] else head
+    end = min(head, start + CONFIG["block_follow_max_blocks"] - 1)
+    new_txns = 0
+    for batch_start in range(start, end + 1, CONFIG["block_batch_size"]):
+        numbers = range(batch_start, min(batch_start + CONFIG["block_batch_size"], end + 1))
+        blocks = await fetch_blocks(url, numbers)
+        batch_txns = 0
+        for block in blocks:
+            tx_count = len(block.get("transactions", []))
+            state["recent_blocks"].append((parse_quantity(block["number"]), parse_quantity(block["timestamp"]), tx_count))
+            batch_txns += tx_count
+        state["last_block_number"] = numbers[-1]
+        state["last_tx_count"] += batch_txns
+        new_txns += batch_txns
+    
+    if end >= start:
+        logging.info(f"Followed blocks {start}-{end} of {target['name']}: {new_txns} transactions")
+        inc_counter("monitor_blocks_followed_total", end - start + 1, target=target["name"])
+        inc_counter("monitor_transactions_followed_total", new_txns, target=target["name"])
+    set_gauge("monitor_block_height", state["last_block_number"], target=target["name"])
+    set_gauge("monitor_chain_head_block", head, target=target["name"])
+    set_gauge("monitor_chain_transactions", state["last_tx_count"], target=target["name"])
+    return {"head": head, "new_blocks": max(0, end - start + 1), "new_txns": new_txns}
+
+def block_statistics(state):
+    """Temps de bloc moyen (s) et transactions par seconde sur les blocs récents"""
+    blocks = state["recent_blocks"]
+    if len(blocks) < 2:
+        return None, None
+    first_number, first_ts, _ = blocks[0]
+    last_number, last_ts, _ = blocks[-1]
+    if last_ts <= first_ts or last_number <= first_number:
+        return None, None
+    txns = sum(tx_count for _, _, tx_count in list(blocks)[1:])
+    return (last_ts - first_ts) / (last_number - first_number), txns / (last_ts - first_ts)
+
+async def get_latest_transactions(target):
+    state = target["state"]
+    loop = asyncio.get_running_loop()
+    
+    # Tête de chaîne par course couverte, puis suivi sur l'endpoint gagnant. Tant que la chaîne n'est pas
+    # fixée, le primaire est seul ; ensuite seuls les fallbacks déjà vus sur cette chaîne sont couverts
+    on_chain = [url for url in target["fallback_rpc_urls"]
+                if state["chain_id"] is not None and state["endpoint_chains"].get(url) == state["chain_id"]]
+    url, head_info, _ = await hedged_rpc(
+        target, functools.partial(fetch_chain_head, target), rpc_hedge_delay(target, target["rpc_url"]), on_chain
+    )
+    if state["chain_id"] is not None:
+        for fallback in target["fallback_rpc_urls"]:
+            if fallback not in state["endpoint_chains"]:
+                asyncio.ensure_future(identify_chain(target, fallback))
+    if url is not None:
+        source = "Primary RPC" if url == target["rpc_url"] else url
+        try:
+            progress = await follow_blocks(target, url, *head_info)
+        except Exception as e:
+            logging.error(f"Error following blocks with {source}: {str(e)}")
+            record_rpc_outcome(target, url, False)
+            progress = None
+    
+    if url is not None and progress is not None:
+        if progress["new_blocks"] and CONFIG["timeseries_db"]:
+            await loop.run_in_executor(probe_executor, save_block_checkpoint, target)
+        block_time, tps = block_statistics(state)
+        return {
+            "block_number": state["last_block_number"],
+            "head_block": progress["head"],
+            "blocks_behind": progress["head"] - state["last_block_number"],
+            "tx_count": state["recent_blocks"][-1][2] if state["recent_blocks"] else 0,
+            "new_blocks": progress["new_blocks"],
+            "new_txns": progress["new_txns"],
+            "total_txns": state["last_tx_count"],
+            "formatted_txns": format_tx_count(state["last_tx_count"]),
+            "block_time": round(block_time, 3) if block_time is not None else None,
+            "tps": round(tps, 4) if tps is not None else None,
+            "source": source
+        }
+    
+    # Aucun endpoint RPC utilisable : API de l'explorateur, puis Etherscan
+    return await loop.run_in_executor(probe_executor, get_transactions_from_apis, target)
+
+def get_transactions_from_apis(target):
+    state = target["state"]
     
-    # Essayer d'abord via l'API de l'explorateur
+    # Essayer via l'API de l'explorateur
     try:
-        response = requests.get(f"{CONFIG['bfexplorer_api_url']}/stats", timeout=CONFIG["http_request_timeout"])
+        response = get_http_session(CONFIG['bfexplorer_api_url']).get(f"{CONFIG['bfexplorer_api_url']}/stats", timeout=CONFIG["http_request_timeout"])
         if response.status_code == 200:
             data = response.json()
-            logging.info(f"Explorer API response: {data}")
+            logging.debug(f"Explorer API response: {data}")
             
             # Vérifier plusieurs champs possibles pour le nombre de transactions
             tx_fields = ["total_transactions", "total_txns", "transactions", "tx_count", "txns"]
@@ -808,9 +1893,9 @@ def get_latest_transactions():
                         continue
                     
                     # Vérifier si le nombre de transactions a augmenté
-                    if total_txns > last_tx_count:
-                        logging.info(f"Transaction count increased from {last_tx_count} to {total_txns}")
-                        last_tx_count = total_txns
+                    if total_txns > state["last_tx_count"]:
+                        logging.info(f"Transaction count increased from {state['last_tx_count']} to {total_txns}")
+                        state["last_tx_count"] = total_txns
                     
                     return {
                         "total_txns": total_txns,
@@ -820,114 +1905,22 @@ def get_latest_transactions():
     except Exception as e:
         logging.error(f"Error with bfexplorer API: {str(e)}")
     
-    # Essayer via le RPC principal
-    try:
-        # Obtenir le dernier bloc pour compter les transactions
-        rpc_payload = {"jsonrpc": "2.0", "method": "eth_getBlockByNumber", "params": ["latest", True], "id": 1}
-        response = requests.post(CONFIG["rpc_url"], json=rpc_payload, timeout=10)
-        if response.status_code == 200:
-            result = response.json()
-            if "result" in result:
-                block = result["result"]
-                tx_count = len(block.get("transactions", []))
-                block_number = int(block.get("number", "0x0"), 16)
-                
-                # Vérifier si le numéro de bloc a augmenté
-                if block_number > last_block_number:
-                    logging.info(f"Block number increased from {last_block_number} to {block_number}")
-                    last_block_number = block_number
-                    
-                    # Si le nombre de transactions dans ce bloc est supérieur à 0
-                    if tx_count > 0:
-                        logging.info(f"New block with {tx_count} transactions")
-                        # Incrémenter le compteur de transactions
-                        last_tx_count += tx_count
-                
-                # Formater le nombre de transactions
-                if last_tx_count >= 1000000:
-                    formatted_txns = f"{last_tx_count/1000000:.3f}M"
-                elif last_tx_count >= 1000:
-                    formatted_txns = f"{last_tx_count/1000:.3f}K"
-                else:
-                    formatted_txns = str(last_tx_count)
-                
-                return {
-                    "block_number": block_number,
-                    "tx_count": tx_count,
-                    "total_txns": last_tx_count,
-                    "formatted_txns": formatted_txns,
-                    "source": "Primary RPC"
-                }
-    except Exception as e:
-        logging.error(f"Error with primary RPC: {str(e)}")
-    
-    # Essayer via les fallback RPCs
-    for fallback_url in CONFIG["fallback_rpc_urls"]:
-        try:
-            rpc_payload = {"jsonrpc": "2.0", "method": "eth_getBlockByNumber", "params": ["latest", True], "id": 1}
-            response = requests.post(fallback_url, json=rpc_payload, timeout=10)
-            if response.status_code == 200:
-                result = response.json()
-                if "result" in result:
-                    block = result["result"]
-                    tx_count = len(block.get("transactions", []))
-                    block_number = int(block.get("number", "0x0"), 16)
-                    
-                    # Vérifier si le numéro de bloc a augmenté
-                    if block_number > last_block_number:
-                        logging.info(f"Block number increased from {last_block_number} to {block_number} (fallback)")
-                        last_block_number = block_number
-                        
-                        # Si le nombre de transactions dans ce bloc est supérieur à 0
-                        if tx_count > 0:
-                            logging.info(f"New block with {tx_count} transactions (fallback)")
-                            # Incrémenter le compteur de transactions
-                            last_tx_count += tx_count
-                    
-                    # Formater le nombre de transactions
-                    if last_tx_count >= 1000000:
-                        formatted_txns = f"{last_tx_count/1000000:.3f}M"
-                    elif last_tx_count >= 1000:
-                        formatted_txns = f"{last_tx_count/1000:.3f}K"
-                    else:
-                        formatted_txns = str(last_tx_count)
-                    
-                    return {
-                        "block_number": block_number,
-                        "tx_count": tx_count,
-                        "total_txns": last_tx_count,
-                        "formatted_txns": formatted_txns,
-                        "source": fallback_url
-                    }
-        except Exception as e:
-            logging.error(f"Error with fallback RPC {fallback_url}: {str(e)}")
-            continue
-    
     # Essayer via Etherscan
     try:
-        response = requests.get("https://api.etherscan.io/api?module=proxy&action=eth_blockNumber&apikey=YourApiKeyToken")
+        response = get_http_session("https://api.etherscan.io").get("https://api.etherscan.io/api?module=proxy&action=eth_blockNumber&apikey=YourApiKeyToken", timeout=CONFIG["http_request_timeout"])
         if response.status_code == 200:
             result = response.json()
             if result["status"] == "1":
+                # Bloc affiché seulement : il ne déplace pas le checkpoint du suivi des blocs
                 block_number = int(result["result"], 16)
                 
-                # Vérifier si le numéro de bloc a augmenté
-                if block_number > last_block_number:
-                    logging.info(f"Block number increased from {last_block_number} to {block_number} (Etherscan)")
-                    last_block_number = block_number
-                
                 # Formater le nombre de transactions
-                if last_tx_count >= 1000000:
-                    formatted_txns = f"{last_tx_count/1000000:.3f}M"
-                elif last_tx_count >= 1000:
-                    formatted_txns = f"{last_tx_count/1000:.3f}K"
-                else:
-                    formatted_txns = str(last_tx_count)
+                formatted_txns = format_tx_count(state["last_tx_count"])
                 
                 return {
                     "block_number": block_number,
                     "tx_count": "Unknown",
-                    "total_txns": last_tx_count,
+                    "total_txns": state["last_tx_count"],
                     "formatted_txns": formatted_txns,
                     "source": "Etherscan API"
                 }
@@ -938,27 +1931,23 @@ def get_latest_transactions():
     logging.warning("All transaction data sources failed, using default value")
     
     # Formater le nombre de transactions par défaut
-    if last_tx_count >= 1000000:
-        formatted_txns = f"{last_tx_count/1000000:.3f}M"
-    elif last_tx_count >= 1000:
-        formatted_txns = f"{last_tx_count/1000:.3f}K"
-    else:
-        formatted_txns = str(last_tx_count)
+    formatted_txns = format_tx_count(state["last_tx_count"])
     
     return {
-        "block_number": last_block_number,
+        "block_number": state["last_block_number"],
         "tx_count": 0,
-        "total_txns": last_tx_count,
+        "total_txns": state["last_tx_count"],
         "formatted_txns": formatted_txns,
         "source": "Default"
     }
 
-def detect_changes(current_results):
-    global previous_results
+def detect_changes(target, current_results):
+    state = target["state"]
+    previous_results = state["previous_results"]
     alerts = []
     
     if not previous_results:
-        previous_results = current_results.copy()
+        state["previous_results"] = current_results
         return alerts
     
     if "ping" in current_results and "ping" in previous_results:
@@ -1045,7 +2034,7 @@ def detect_changes(current_results):
             })
     
     if "ports" in current_results and "ports" in previous_results:
-        for port in CONFIG["ports_to_check"]:
+        for port in target["ports_to_check"]:
             if port in current_results["ports"] and port in previous_results["ports"]:
                 if current_results["ports"][port] != previous_results["ports"][port]:
                     alerts.append({
@@ -1054,70 +2043,830 @@ def detect_changes(current_results):
                         "severity": "warning"
                     })
     
-    previous_results = current_results.copy()
+    # current_results est construit à chaque cycle et jamais modifié ensuite
+    state["previous_results"] = current_results
     
     return alerts
 
-def cleanup_expired_alerts():
-    global latest_data
-    current_time = time.time()
+def active_alerts(alerts, now):
+    """Alertes encore affichées : persistantes, ou de moins de 30 minutes (10 au plus)"""
+    alerts = [
+        alert for alert in alerts
+        if (now - alert.get("timestamp", 0) < 1800 or
+            alert.get("type") in ["rpc_status", "server_status"])
+    ]
+    return alerts[-10:]
+
+def status_alert(previous, alert_type, label, status, now):
+    """Nouvelle version de l'alerte persistante d'un statut (l'ancienne n'est pas modifiée)"""
+    if previous is None:
+        return {
+            "type": alert_type,
+            "message": f"{label} Status: {status}",
+            "severity": "info" if status == "online" else "warning",
+            "timestamp": now,
+            "start_time": now if status == "offline" else None,
+            "end_time": None,
+            "persistent": True
+        }
     
-    if "alerts" in latest_data:
-        latest_data["alerts"] = [
-            alert for alert in latest_data["alerts"] 
-            if (current_time - alert.get("timestamp", 0) < 1800 or
-                alert.get("type") in ["rpc_status", "server_status"])
-        ]
+    alert = dict(previous, timestamp=now)
+    if status == "online":
+        alert.update(severity="info", message=f"✅ {label} Status: online", end_time=None, start_time=None)
+    else:
+        if previous.get("severity") == "info":
+            alert.update(start_time=now, end_time=None)
+        alert.update(
+            severity="warning",
+            message=f"⚠️ {label} is down since {datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+    return alert
+
+def replace_alert(alerts, previous, alert):
+    """Remplace une alerte par sa nouvelle version, à la même place (ajoutée si absente)"""
+    for index, existing in enumerate(alerts):
+        if existing is previous:
+            return alerts[:index] + [alert] + alerts[index + 1:]
+    return alerts + [alert]
+
+def target_payload(target):
+    """Données publiées d'une cible, historiques matérialisés au dernier moment"""
+    state = target["state"]
+    payload = published_fields(state)
+    payload["history"] = state["check_history"].to_dicts(CONFIG["history_size"], include_ts=True)
+    payload["ping_history"] = state["ping_history"].to_dicts(CONFIG["ping_history_size"], include_ts=True)
+    payload["version"] = version_token(state["version"])
+    return payload
+
+def version_token(version):
+    """Version publiée (« époque-numéro ») : ETag, ?since= de /api/data et id des évènements SSE"""
+    return f"{publish_epoch}-{version}"
+
+def parse_version_token(snapshot, token):
+    """Numéro d'une version publiée par le processus qui a construit le snapshot (None sinon)"""
+    epoch, _, number = (token or "").rpartition("-")
+    if epoch != snapshot["epoch"] or not number.isdigit():
+        return None
+    return int(number)
+
+def build_snapshot(target):
+    """Sérialise une fois les données publiées d'une cible (JSON et gzip) pour /api/data"""
+    state = target["state"]
+    version = version_token(state["version"])
+    body = json.dumps(target_payload(target), separators=(",", ":")).encode("utf-8")
+    level = CONFIG["snapshot_gzip_level"]
+    return {
+        "version": version,
+        "epoch": publish_epoch,
+        "etag": f"{target['name']}-{version}",
+        "body": body,
+        "gzip_body": gzip.compress(body, compresslevel=level) if level > 0 else None,
+        # Copie indépendante des champs publiés pour les réponses delta
+        "data": json.loads(body),
+        "key_versions": dict(state["key_versions"]),
+        "marks": tuple(state["version_marks"])
+    }
+
+def publish_changes(target):
+    """Attribue une nouvelle version aux données d'une cible si une clé ou un historique a changé"""
+    state = target["state"]
+    fingerprints = state["published_fingerprints"]
+    changed = []
+    for key, value in published_fields(state).items():
+        fingerprint = json.dumps(value, sort_keys=True, default=str)
+        if fingerprints.get(key) != fingerprint:
+            fingerprints[key] = fingerprint
+            changed.append(key)
+    
+    totals = (state["check_history"].total, state["ping_history"].total)
+    marks = state["version_marks"]
+    if not changed and marks and marks[-1][1:] == totals:
+        return state["version"]
+    
+    version = state["version"] + 1
+    for key in changed:
+        state["key_versions"][key] = version
+    marks.append((version,) + totals)
+    state["version"] = version
+    # Publication par simple remplacement de référence : les lecteurs voient l'ancien ou le nouveau snapshot
+    state["snapshot"] = build_snapshot(target)
+    state["status"] = target_status(target)
+    with stream_condition:
+        stream_condition.notify_all()
+    if CONFIG["serve_mode"] == "monitor":
+        minute_buckets = state["history_buckets"]["minute"]
+        if minute_buckets and minute_buckets[-1][0] != state["history_written"][1]:
+            # Bucket clos : recopié avant le snapshot qui le signale aux clients
+            write_history_record(target)
+        write_store_record(f"target-{target['name']}", published_record(target))
+    return version
+
+def write_monitor_record():
+    """Publie dans le store l'état du processus de surveillance (written_at sert de battement de cœur)"""
+    write_store_record("monitor", {
+        "pid": os.getpid(),
+        "workers": probe_executor.stats(),
+        "metrics": render_metrics(),
+        "written_at": time.time()
+    })
+
+def monitor_record():
+    """Enregistrement du processus de surveillance (mode web) et s'il est périmé (processus arrêté ou bloqué)"""
+    record = read_store_record("monitor")
+    stale = record is None or time.time() - record["written_at"] > CONFIG["store_stale_after"]
+    return record, stale
+
+def target_status(target):
+    """État de l'ordonnanceur d'une cible : intervalles courants, rafale et santé des RPC"""
+    return {
+        "current_intervals": {kind: current_interval(target, kind) for kind in ["cycle", "ping", "dns"]},
+        "burst": time.time() < target["state"]["burst_until"],
+        "rpc_health": {
+            url: dict(rpc_health(target, url), score=round(rpc_health(target, url)["score"], 3))
+            for url in [target["rpc_url"]] + target["fallback_rpc_urls"]
+        }
+    }
+
+def published_record(target):
+    """Ce que servent les workers web pour une cible à chaque publication : snapshot et statut.
+    
+    Sérialisé en JSON dans le store (encode_store_value) : uniquement des types de base, octets et deques.
+    """
+    state = target["state"]
+    return {
+        "snapshot": state["snapshot"],
+        "status": state["status"]
+    }
+
+def write_history_record(target):
+    """Recopie dans le store les historiques de /api/history (pings bruts récents et buckets).
+    
+    Trop volumineux pour chaque publication : écrit à chaque clôture de bucket et toutes les store_history_interval.
+    """
+    state = target["state"]
+    write_store_record(f"history-{target['name']}", {
+        "ping_points": recent_pings(state, time.time() - CONFIG["store_raw_window"]),
+        "history_buckets": state["history_buckets"]
+    })
+    minute_buckets = state["history_buckets"]["minute"]
+    state["history_written"] = (time.time(), minute_buckets[-1][0] if minute_buckets else None)
+
+def recent_pings(view, start):
+    """Pings bruts horodatés depuis start : historique en mémoire, ou copie du store"""
+    if "ping_points" in view:
+        return [point for point in view["ping_points"] if point["ts"] >= start]
+    ping_history = view["ping_history"]
+    return ping_history.to_dicts(ping_history.count_since(start), include_ts=True)
+
+def claim_refresh(target):
+    """Réserve un rafraîchissement manuel de la cible : 0 si accepté, sinon secondes à attendre.
+    
+    En mode web la date du dernier rafraîchissement est partagée par les workers dans le store, sous verrou.
+    """
+    now = time.time()
+    min_interval = CONFIG["refresh_min_interval"]
+    if CONFIG["serve_mode"] != "web":
+        with refresh_claims_lock:
+            wait = refresh_claims.get(target["name"], 0) + min_interval - now
+            if wait <= 0:
+                refresh_claims[target["name"]] = now
+        return max(wait, 0)
+    
+    import fcntl  # Mode web uniquement (gunicorn, POSIX)
+    with open(store_path(target["name"], "lastrefresh"), "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            last = float(f.read() or 0)
+        except ValueError:
+            last = 0
+        wait = last + min_interval - now
+        if wait <= 0:
+            f.truncate(0)
+            f.write(str(now))
+    return max(wait, 0)
+
+def store_path(name, suffix="shm"):
+    return os.path.join(CONFIG["snapshot_store"], f"{name}.{suffix}")
+
+def encode_store_value(value):
+    """Types d'un enregistrement du store absents de JSON : octets (en base64) et deques"""
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, deque):
+        return list(value)
+    raise TypeError(f"Unsupported store value: {type(value).__name__}")
+
+def decode_store_value(obj):
+    if len(obj) == 1 and "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+def write_store_record(name, record):
+    """Publie un enregistrement dans le segment mmap du store, protégé par un seqlock.
+    
+    La séquence est impaire pendant la copie : les lecteurs recommencent au lieu de prendre un verrou.
+    Un enregistrement trop grand pour le segment part dans un nouveau fichier qui remplace l'ancien.
+    """
+    payload = json.dumps(record, separators=(",", ":"), default=encode_store_value).encode("utf-8")
+    size = STORE_HEADER_SIZE + len(payload)
+    segment = store_segments.get(name)
+    if segment is not None and size <= len(segment):
+        # La séquence paire n'est republiée qu'une fois la longueur et les données en place
+        seq = STORE_FIELD.unpack_from(segment, STORE_SEQ)[0]
+        STORE_FIELD.pack_into(segment, STORE_SEQ, seq + 1)
+        segment[STORE_HEADER_SIZE:size] = payload
+        STORE_FIELD.pack_into(segment, STORE_LENGTH, len(payload))
+        STORE_FIELD.pack_into(segment, STORE_SEQ, seq + 2)
+        return
+    
+    path = store_path(name)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    capacity = max(CONFIG["store_segment_size"], 2 * size)
+    with open(temp_path, "w+b") as f:
+        f.truncate(capacity)
+        new_segment = mmap.mmap(f.fileno(), capacity)
+    new_segment[STORE_HEADER_SIZE:size] = payload
+    STORE_FIELD.pack_into(new_segment, STORE_LENGTH, len(payload))
+    STORE_FIELD.pack_into(new_segment, STORE_SEQ, 2)
+    
+    if segment is None and os.path.exists(path):
+        # Segment laissé par un processus de surveillance précédent
+        with open(path, "r+b") as f:
+            segment = mmap.mmap(f.fileno(), 0)
+    os.replace(temp_path, path)
+    if segment is not None:
+        # Les lecteurs de l'ancien segment rouvrent le fichier
+        STORE_FIELD.pack_into(segment, STORE_RETIRED, 1)
+        segment.close()
+    store_segments[name] = new_segment
+
+def read_store_record(name):
+    """Dernier enregistrement publié par le processus de surveillance (None s'il n'existe pas encore).
+    
+    Sans verrou : la copie n'est gardée que si la séquence, paire, n'a pas changé pendant la lecture.
+    Tant que la séquence ne bouge pas, l'enregistrement déjà désérialisé est resservi.
+    """
+    cached = store_cache.get(name)
+    for _ in range(CONFIG["store_read_retries"]):
+        if cached is None or STORE_FIELD.unpack_from(cached[0], STORE_RETIRED)[0]:
+            try:
+                with open(store_path(name), "rb") as f:
+                    segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                return None
+            cached = (segment, None, cached[2] if cached else None)
         
-        if len(latest_data["alerts"]) > 10:
-            latest_data["alerts"] = latest_data["alerts"][-10:]
+        segment = cached[0]
+        seq = STORE_FIELD.unpack_from(segment, STORE_SEQ)[0]
+        if seq == cached[1]:
+            return cached[2]
+        if seq % 2 or seq == 0:
+            time.sleep(0)  # Écriture en cours
+            continue
+        length = STORE_FIELD.unpack_from(segment, STORE_LENGTH)[0]
+        payload = segment[STORE_HEADER_SIZE:STORE_HEADER_SIZE + length]
+        if STORE_FIELD.unpack_from(segment, STORE_SEQ)[0] != seq:
+            continue
+        try:
+            record = json.loads(payload, object_hook=decode_store_value)
+        except ValueError as e:
+            # Segment d'un autre format (ancienne version du processus de surveillance)
+            logging.error(f"Unreadable store record {name}: {str(e)}")
+            return None
+        cached = (segment, seq, record)
+        store_cache[name] = cached
+        return cached[2]
+    return cached[2] if cached else None
+
+def target_view(target):
+    """Données servies d'une cible : son état en mémoire, ou en mode web le dernier enregistrement du store"""
+    if CONFIG["serve_mode"] == "web":
+        record = read_store_record(f"target-{target['name']}")
+        if record is not None:
+            return record
+    return target["state"]
 
-def update_data():
-    global latest_data, check_history, rpc_status_alert, server_status_alert, last_ip_log_time
+def history_view(target):
+    """Historiques servis par /api/history : état en mémoire, ou en mode web leur dernière copie dans le store"""
+    if CONFIG["serve_mode"] == "web":
+        record = read_store_record(f"history-{target['name']}")
+        if record is not None:
+            return record
+    return target["state"]
+
+def wait_for_version(target, version, timeout):
+    """Attend qu'une cible publie une version différente de `version` (False au bout de timeout)"""
+    if CONFIG["serve_mode"] != "web":
+        state = target["state"]
+        with stream_condition:
+            return stream_condition.wait_for(lambda: state["snapshot"]["version"] != version, timeout=timeout)
+    # Pas de notification entre processus : relecture périodique du store
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if target_view(target)["snapshot"]["version"] != version:
+            return True
+        time.sleep(CONFIG["store_poll_interval"])
+    return False
+
+async def store_refresh_loop():
+    """Transmet à la boucle des sondes les demandes de rafraîchissement déposées par les workers web.
+    
+    Écrit aussi, à leur propre rythme, l'enregistrement du processus (métriques, battement de cœur pour les
+    workers) et les historiques des cibles : une publication ne recopie que le snapshot.
+    """
+    store = CONFIG["snapshot_store"]
+    last_heartbeat = 0
+    while True:
+        await asyncio.sleep(CONFIG["store_poll_interval"])
+        now = time.time()
+        if now - last_heartbeat > CONFIG["store_stale_after"] / 4:
+            write_monitor_record()
+            last_heartbeat = now
+        for target in targets.values():
+            if now - target["state"]["history_written"][0] > CONFIG["store_history_interval"]:
+                write_history_record(target)
+        for filename in os.listdir(store):
+            if not filename.endswith(".refresh"):
+                continue
+            path = os.path.join(store, filename)
+            try:
+                with open(path) as f:
+                    refresh = json.load(f)
+                os.remove(path)
+            except (OSError, ValueError) as e:
+                logging.error(f"Invalid refresh request {filename}: {str(e)}")
+                continue
+            target = targets.get(refresh.get("target"))
+            if target is not None:
+                request_refresh(target, refresh["probes"])
+
+def open_timeseries_db():
+    """Ouvre (et crée si besoin) la base SQLite des séries temporelles"""
+    global timeseries_db
+    with timeseries_lock:
+        if timeseries_db is None:
+            timeseries_db = sqlite3.connect(CONFIG["timeseries_db"], check_same_thread=False)
+            timeseries_db.execute("PRAGMA journal_mode=WAL")
+            timeseries_db.executescript("""
+                CREATE TABLE IF NOT EXISTS samples (target TEXT, metric TEXT, ts REAL, value REAL);
+                CREATE INDEX IF NOT EXISTS samples_series ON samples (target, metric, ts);
+                CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+                CREATE TABLE IF NOT EXISTS rollups (
+                    tier TEXT, target TEXT, metric TEXT, bucket INTEGER,
+                    count INTEGER, min REAL, avg REAL, max REAL, p95 REAL,
+                    PRIMARY KEY (tier, target, metric, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS rollup_state (tier TEXT PRIMARY KEY, next_bucket INTEGER);
+                CREATE TABLE IF NOT EXISTS block_checkpoints (
+                    target TEXT PRIMARY KEY, chain_id TEXT, block_number INTEGER, tx_count REAL, updated REAL
+                );
+            """)
+    return timeseries_db
+
+def bucket_start(ts, resolution):
+    """Début du bucket contenant ts, aligné en UTC comme les agrégats SQLite"""
+    size = {"minute": 60, "hour": 3600, "day": 86400}[resolution]
+    return ts - ts % size
+
+def add_to_history_buckets(state, metric, value, ts):
+    """Ajoute un échantillon au bucket courant de chaque résolution (O(1))"""
+    column = 1 if metric == "ping" else 3
+    for resolution, buckets in state["history_buckets"].items():
+        start = bucket_start(ts, resolution)
+        if not buckets or buckets[-1][0] < start:
+            buckets.append([start, 0.0, 0, 0.0, 0])
+        bucket = buckets[-1]
+        if bucket[0] != start:
+            # Échantillon en retard : rattaché au bucket déjà clos qui le contient, s'il est encore gardé
+            bucket = next((b for b in reversed(buckets) if b[0] <= start), None)
+            if bucket is None or bucket[0] != start:
+                continue
+        bucket[column] += value
+        bucket[column + 1] += 1
+
+def record_sample(target, metric, value, ts=None):
+    """Enregistre un échantillon de latence (ms) : buckets en mémoire et flush SQLite"""
+    if value is None:
+        return
+    ts = ts or time.time()
+    if metric in ["ping", "rpc"]:
+        add_to_history_buckets(target["state"], metric, float(value), ts)
+    if CONFIG["timeseries_db"]:
+        timeseries_pending.append((target["name"], metric, ts, float(value)))
+
+def query_history_buckets(state, resolution, start, end):
+    """Points moyens des buckets de [start, end[ pour une résolution"""
+    buckets = list(state["history_buckets"][resolution])
+    first = bisect.bisect_left([bucket[0] for bucket in buckets], bucket_start(start, resolution))
+    points = []
+    for bucket_ts, ping_sum, ping_count, rpc_sum, rpc_count in buckets[first:]:
+        if bucket_ts >= end:
+            break
+        points.append({
+            "ts": bucket_ts,
+            "ping": ping_sum / ping_count if ping_count else None,
+            "rpc": rpc_sum / rpc_count if rpc_count else None,
+            "ping_count": ping_count,
+            "rpc_count": rpc_count
+        })
+    return points
+
+def save_block_checkpoint(target):
+    """Enregistre le checkpoint du suivi des blocs (reprise après redémarrage)"""
+    state = target["state"]
+    db = open_timeseries_db()
+    with timeseries_lock:
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO block_checkpoints VALUES (?, ?, ?, ?, ?)",
+                (target["name"], state["chain_id"], state["last_block_number"], state["last_tx_count"], time.time())
+            )
+
+def load_block_checkpoint(target):
+    """Reprend le suivi des blocs au dernier checkpoint enregistré"""
+    state = target["state"]
+    db = open_timeseries_db()
+    with timeseries_lock:
+        row = db.execute(
+            "SELECT chain_id, block_number, tx_count FROM block_checkpoints WHERE target = ?", (target["name"],)
+        ).fetchone()
+    if not row:
+        return
+    chain_id = chain_id_of(row[0])
+    if state["chain_id"] is not None and chain_id != state["chain_id"]:
+        logging.warning(f"Ignoring checkpoint of {target['name']} on chain {chain_id}, expecting {state['chain_id']}")
+        return
+    # La chaîne n'est fixée qu'à la confirmation du RPC principal (fetch_chain_head)
+    state["checkpoint_chain_id"] = chain_id
+    state["last_block_number"], state["last_tx_count"] = row[1:]
+    logging.info(f"Resuming {target['name']} at block {row[1]} with {row[2]} transactions")
+
+def seed_history_buckets(target):
+    """Recharge les buckets en mémoire depuis les agrégats SQLite (après un redémarrage)"""
+    state = target["state"]
+    tiers = {"minute": "1m", "hour": "1h", "day": "1d"}
+    db = open_timeseries_db()
+    for resolution, buckets in state["history_buckets"].items():
+        rows = {}
+        with timeseries_lock:
+            for metric, bucket, count, avg in db.execute(
+                "SELECT metric, bucket, count, avg FROM rollups WHERE tier = ? AND target = ? "
+                "AND metric IN ('ping', 'rpc') ORDER BY bucket DESC LIMIT ?",
+                (tiers[resolution], target["name"], 2 * buckets.maxlen)
+            ):
+                row = rows.setdefault(bucket, [bucket, 0.0, 0, 0.0, 0])
+                column = 1 if metric == "ping" else 3
+                row[column] += avg * count
+                row[column + 1] += count
+        for bucket in sorted(rows):
+            buckets.append(rows[bucket])
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche d'une liste triée"""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+def rollup_timeseries(db, now):
+    """Calcule min/avg/max/p95 des buckets clos de chaque niveau à partir des données brutes.
+    
+    Un bucket n'est agrégé qu'une fois passé le délai d'arrivée des échantillons en retard
+    (échéance d'un cycle plus un intervalle de flush).
+    """
+    closed_before = now - CONFIG["probe_cycle_deadline"] - CONFIG["timeseries_flush_interval"]
+    for tier, size in TIMESERIES_TIERS.items():
+        row = db.execute("SELECT next_bucket FROM rollup_state WHERE tier = ?", (tier,)).fetchone()
+        if row:
+            start = row[0]
+        else:
+            first = db.execute("SELECT MIN(ts) FROM samples").fetchone()[0]
+            if first is None:
+                continue
+            start = int(first // size) * size
+        end = int(closed_before // size) * size
+        if end <= start:
+            continue
+        
+        groups = {}
+        for name, metric, bucket, value in db.execute(
+            "SELECT target, metric, CAST(ts / ? AS INTEGER) * ?, value FROM samples WHERE ts >= ? AND ts < ?",
+            (size, size, start, end)
+        ):
+            groups.setdefault((name, metric, bucket), []).append(value)
+        
+        rows = []
+        for (name, metric, bucket), values in groups.items():
+            values.sort()
+            rows.append((tier, name, metric, bucket, len(values), values[0],
+                         sum(values) / len(values), values[-1], percentile(values, 0.95)))
+        db.executemany("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.execute("INSERT OR REPLACE INTO rollup_state VALUES (?, ?)", (tier, end))
+
+def flush_timeseries(samples):
+    """Écrit les échantillons, met à jour les agrégats et applique la rétention"""
+    now = time.time()
+    db = open_timeseries_db()
+    with timeseries_lock:
+        with db:
+            db.executemany("INSERT INTO samples VALUES (?, ?, ?, ?)", samples)
+            rollup_timeseries(db, now)
+            retention = CONFIG["timeseries_retention"]
+            # Le brut doit couvrir au moins un bucket journalier pour le calcul des agrégats
+            db.execute("DELETE FROM samples WHERE ts < ?", (now - max(retention["raw"], 86400 + 3600),))
+            for tier in TIMESERIES_TIERS:
+                db.execute("DELETE FROM rollups WHERE tier = ? AND bucket < ?", (tier, now - retention[tier]))
+
+async def timeseries_loop():
+    """Écrit périodiquement les échantillons en attente, hors de la boucle asyncio"""
+    global timeseries_pending
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CONFIG["timeseries_flush_interval"])
+        if not timeseries_pending:
+            continue
+        samples, timeseries_pending = timeseries_pending, []
+        try:
+            await loop.run_in_executor(probe_executor, flush_timeseries, samples)
+        except Exception as e:
+            logging.error(f"Error writing time series: {str(e)}")
+
+def query_timeseries(target_name, metric, start, end, resolution="auto", max_points=500):
+    """Renvoie une série sur [start, end[ au niveau demandé (raw, 1m, 1h, 1d ou auto)"""
+    if resolution == "auto":
+        # Brut jusqu'à une heure, puis le niveau le plus fin qui tient en max_points
+        if end - start <= 3600:
+            resolution = "raw"
+        else:
+            resolution = next(
+                (tier for tier, size in TIMESERIES_TIERS.items() if (end - start) / size <= max_points),
+                "1d"
+            )
+    
+    db = open_timeseries_db()
+    with timeseries_lock:
+        if resolution == "raw":
+            rows = db.execute(
+                "SELECT ts, value FROM samples WHERE target = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (target_name, metric, start, end)
+            ).fetchall()
+            return resolution, [{"ts": ts, "value": value} for ts, value in rows]
+        if resolution not in TIMESERIES_TIERS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        rows = db.execute(
+            "SELECT bucket, count, min, avg, max, p95 FROM rollups WHERE tier = ? AND target = ? AND metric = ? "
+            "AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (resolution, target_name, metric, int(start // TIMESERIES_TIERS[resolution]) * TIMESERIES_TIERS[resolution], end)
+        ).fetchall()
+    return resolution, [
+        {"ts": bucket, "count": count, "min": vmin, "avg": vavg, "max": vmax, "p95": p95}
+        for bucket, count, vmin, vavg, vmax, p95 in rows
+    ]
+
+def start_probe(func):
+    """Lance une sonde : coroutine sur la boucle partagée, fonction synchrone sur le pool"""
+    if asyncio.iscoroutinefunction(func):
+        # Les sondes asynchrones tournent sur la boucle partagée, sans thread dédié
+        return asyncio.ensure_future(func())
+    return asyncio.get_running_loop().run_in_executor(probe_executor, func)
+
+async def run_probes(target, probes, deadline):
+    """Exécute les sondes en parallèle avec une échéance commune au cycle"""
+    futures = {name: start_probe(func) for name, (func, fallback) in probes.items()}
+    if not futures:
+        return {}
+    done, not_done = await asyncio.wait(futures.values(), timeout=deadline)
+    
+    results = {}
+    for name, future in futures.items():
+        fallback = probes[name][1]
+        if future in not_done:
+            # La sonde continue en arrière-plan mais ne bloque plus l'instantané
+            future.cancel()
+            logging.warning(f"Probe {name} missed the {deadline}s cycle deadline")
+            inc_counter("monitor_probe_errors_total", target=target["name"], probe=name, reason="timeout")
+            results[name] = fallback("timeout", f"Probe exceeded {deadline}s deadline")
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logging.error(f"Error in probe {name}: {str(e)}")
+            inc_counter("monitor_probe_errors_total", target=target["name"], probe=name, reason="error")
+            results[name] = fallback("error", str(e))
+    
+    return results
+
+def cacheable_result(value):
+    """Un résultat en erreur n'est jamais mis en cache"""
+    if isinstance(value, dict):
+        return bool(value) and "error" not in value and value.get("ip") != "Error"
+    return True
+
+def store_probe_result(target, name, value):
+    if cacheable_result(value):
+        target["state"]["probe_cache"][name] = {"value": value, "fetched_at": time.time()}
+
+def caching_probe(target, name, func):
+    """Enveloppe une sonde pour mettre en cache son résultat quand elle réussit"""
+    async def run():
+        value = await start_probe(func)
+        store_probe_result(target, name, value)
+        return value
+    return run
+
+async def refresh_cached_probe(target, name, func):
+    """Rafraîchit en arrière-plan un résultat périmé et le publie aussitôt"""
+    state = target["state"]
+    state["probe_refreshing"].add(name)
+    try:
+        value = await asyncio.wait_for(start_probe(func), CONFIG["probe_cycle_deadline"])
+        store_probe_result(target, name, value)
+        if cacheable_result(value):
+            # Publié depuis le cache (published_fields) : le CycleRecord reste à update_data
+            publish_changes(target)
+    except Exception as e:
+        logging.warning(f"Background refresh of {name} failed for {target['name']}: {str(e)}")
+    finally:
+        state["probe_refreshing"].discard(name)
+
+def cached_probe_result(target, name, func):
+    """Entrée du cache d'une sonde (None si absente) ; une entrée périmée est servie et rafraîchie en arrière-plan"""
+    state = target["state"]
+    entry = state["probe_cache"].get(name)
+    if entry is None:
+        return None
+    if time.time() - entry["fetched_at"] >= CONFIG["probe_cache_ttls"][name] and name not in state["probe_refreshing"]:
+        asyncio.ensure_future(refresh_cached_probe(target, name, func))
+    return entry
+
+def request_refresh(target, names):
+    """Invalide des résultats en cache et relance tout de suite un cycle de la cible (boucle des sondes)"""
+    state = target["state"]
+    for name in names:
+        state["probe_cache"].pop(name, None)
+    if "version_info" in names:
+        state["force_dns_check"] = True
+    state["run_now"] = True
+    if scheduler_wakeup is not None:
+        scheduler_wakeup.set()
+
+def base_interval(target, kind):
+    """Intervalle configuré d'une sonde (cycle, ping ou serial DNS)"""
+    return {"cycle": target["check_interval"], "ping": target["ping_interval"], "dns": target["dns_check_interval"]}[kind]
+
+def current_interval(target, kind):
+    """Intervalle à appliquer maintenant : rafale pendant un incident, sinon intervalle adapté"""
+    state = target["state"]
+    if time.time() < state["burst_until"]:
+        return min(CONFIG["burst_intervals"][kind], base_interval(target, kind))
+    return state["intervals"][kind]
+
+def adapt_interval(target, kind, signature):
+    """Allonge l'intervalle d'une sonde dont le résultat n'a pas changé, le ramène à la base sinon"""
+    state = target["state"]
+    base = base_interval(target, kind)
+    changed = state["probe_signatures"].get(kind) != signature
+    state["probe_signatures"][kind] = signature
+    
+    if not CONFIG["adaptive_intervals"] or changed:
+        interval = base
+    else:
+        interval = min(state["intervals"][kind] * CONFIG["interval_backoff_factor"], max(base, CONFIG["max_intervals"][kind]))
+    state["intervals"][kind] = interval
+    return interval
+
+def start_burst(target, reason):
+    """Passe une cible en mode rafale pour burst_window secondes et avance ses prochaines sondes"""
+    if not CONFIG["adaptive_intervals"]:
+        return
+    state = target["state"]
+    now = time.time()
+    if now >= state["burst_until"]:
+        logging.warning(f"Burst mode for {target['name']} ({CONFIG['burst_window']}s): {reason}")
+        state["run_now"] = True
+        if scheduler_wakeup is not None:
+            scheduler_wakeup.set()
+    state["burst_until"] = now + CONFIG["burst_window"]
+
+async def update_data(target):
+    """Exécute un cycle de sondes pour une cible et publie ses données"""
+    state = target["state"]
+    previous = state["cycle"]
+    check_history = state["check_history"]
     
     current_time_seconds = time.time()
     timestamp_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    logging.info(f"Starting data update at {timestamp_str}")
+    logging.info(f"Starting data update for {target['name']} at {timestamp_str}")
     
-    cleanup_expired_alerts()
+    # Résolution du domaine (cache TTL) : latence DNS suivie comme métrique à part
+    try:
+        resolution = await resolve_host(target['domain'])
+        if resolution["resolved_at"] > state["last_dns_resolution"]:
+            state["last_dns_resolution"] = resolution["resolved_at"]
+            record_sample(target, "dns", resolution["elapsed_ms"], resolution["resolved_at"])
+            observe_latency("monitor_dns_resolution_seconds", resolution["elapsed_ms"], target=target["name"])
+        dns_resolution = {
+            "ip": resolution["ips"][0],
+            "source": resolution["source"],
+            "ttl": resolution["ttl"],
+            "elapsed_ms": round(resolution["elapsed_ms"], 2)
+        }
+    except Exception as e:
+        logging.error(f"Error resolving {target['domain']}: {str(e)}")
+        dns_resolution = previous.dns_resolution
     
     # Log IP resolution une fois par minute
-    if current_time_seconds - last_ip_log_time > 60:
+    if current_time_seconds - state["last_ip_log_time"] > 60:
         try:
-            domain_ip = socket.gethostbyname(CONFIG['domain'])
-            logging.info(f"Ping domain: {CONFIG['domain']}, resolved IP: {domain_ip}")
+            domain_ip = await resolve_ip(target['domain'])
+            logging.info(f"Ping domain: {target['domain']}, resolved IP: {domain_ip}")
             
-            from urllib.parse import urlparse
-            parsed_url = urlparse(CONFIG["rpc_url"])
-            rpc_domain = parsed_url.netloc
-            rpc_ip = socket.gethostbyname(rpc_domain)
-            logging.info(f"RPC domain: {rpc_domain}, resolved IP: {rpc_ip}")
+            if target["rpc_url"]:
+                rpc_domain = urlparse(target["rpc_url"]).hostname
+                rpc_ip = await resolve_ip(rpc_domain)
+                logging.info(f"RPC domain: {rpc_domain}, resolved IP: {rpc_ip}")
             
-            last_ip_log_time = current_time_seconds
+            state["last_ip_log_time"] = current_time_seconds
         except Exception as e:
             logging.error(f"Error resolving domains: {str(e)}")
     
-    try:
-        rpc_result = check_rpc_endpoint()
-    except Exception as e:
-        logging.error(f"Error checking RPC: {str(e)}")
-        rpc_result = {"status": "error", "message": str(e)}
+    # Le serial DNS n'est interrogé qu'à l'intervalle (adaptatif) de la sonde dns
+    dns_check_due = (current_time_seconds - previous.last_dns_check > current_interval(target, "dns")
+                     or state["force_dns_check"])
+    state["force_dns_check"] = False
+    
+    # Requêtes HTTP/HTTPS/TLS partagées par les sondes de ce cycle
+    snapshot = new_target_snapshot(target)
+    
+    probes = {
+        "rpc": (functools.partial(check_rpc_endpoint, target), lambda status, message: {"status": status, "message": message}),
+        "ports": (functools.partial(check_ports_alt, target), lambda status, message: {port: {"status": status, "latency_ms": None} for port in target["ports_to_check"]} if status == "timeout" else {}),
+        "ping": (functools.partial(ping_host, target), lambda status, message: {"status": status, "message": message}),
+        "ip_info": (functools.partial(get_ip_info, target), lambda status, message: "Error" if status == "error" else status),
+        "http_info": (functools.partial(get_http_info, target, snapshot), lambda status, message: "Error" if status == "error" else status),
+        "security_info": (functools.partial(get_security_info, target, snapshot), lambda status, message: "Error" if status == "error" else status),
+        "ssl_info": (functools.partial(get_ssl_info, target, snapshot), lambda status, message: {"error": message}),
+        "txt_info": (functools.partial(get_txt_records, target), lambda status, message: []),
+        "dns_records": (functools.partial(get_dns_records, target), lambda status, message: {}),
+        "network_info": (functools.partial(get_network_info, target, snapshot), lambda status, message: {}),
+        "transactions": (functools.partial(get_latest_transactions, target), lambda status, message: {"error": message}),
+        "main_domain_info": (functools.partial(get_main_domain_info, target), lambda status, message: {"ip": "Error", "redirect": "Error"} if status == "error" else {"ip": status, "redirect": status}),
+        "ip_consistent": (functools.partial(verify_ip_consistency, target), lambda status, message: False)
+    }
+    if dns_check_due:
+        probes["version_info"] = (functools.partial(get_dns_serial, target), lambda status, message: "Error" if status == "error" else status)
+    
+    # Les sondes désactivées pour cette cible gardent la forme de leur résultat
+    enabled = {name: probe for name, probe in probes.items() if name in target["probes"]}
+    
+    # Faits lents à changer : servis depuis le cache, la sonde ne tourne dans le cycle qu'en l'absence d'entrée
+    cached_results = {}
+    to_run = {}
+    for name, (func, fallback) in enabled.items():
+        if name not in CONFIG["probe_cache_ttls"]:
+            to_run[name] = (func, fallback)
+            continue
+        entry = cached_probe_result(target, name, func)
+        if entry is None:
+            to_run[name] = (caching_probe(target, name, func), fallback)
+        else:
+            cached_results[name] = entry
+    
+    results = await run_probes(target, to_run, CONFIG["probe_cycle_deadline"])
+    for name, entry in cached_results.items():
+        # Un rafraîchissement terminé pendant le cycle a pu remplacer l'entrée
+        results[name] = state["probe_cache"].get(name, entry)["value"]
+    for name, (func, fallback) in probes.items():
+        if name not in enabled:
+            results[name] = fallback("disabled", "Probe disabled for this target")
+    
+    rpc_result = results["rpc"]
+    port_scan = results["ports"]
+    port_results = {port: result["status"] for port, result in port_scan.items()}
+    ping_result = results["ping"]
+    ip_info = results["ip_info"]
+    http_info = results["http_info"]
+    security_info = results["security_info"]
+    ssl_info = results["ssl_info"]
+    txt_info = results["txt_info"]
+    dns_records = results["dns_records"]
+    network_info = results["network_info"]
+    transactions_info = results["transactions"]
+    main_domain_info = results["main_domain_info"]
+    ip_consistent = results["ip_consistent"]
+    
+    last_dns_check = previous.last_dns_check
+    if dns_check_due:
+        version_info = results["version_info"]
+        if version_info not in ["Error", "timeout", "disabled"]:
+            last_dns_check = current_time_seconds
+            adapt_interval(target, "dns", version_info)
+    else:
+        version_info = previous.version_info
     
     rpc_status = rpc_result.get("status", "offline")
-    
-    try:
-        port_results = check_ports_alt()
-    except Exception as e:
-        logging.error(f"Error checking ports: {str(e)}")
-        port_results = {}
-    
-    try:
-        ping_result = ping_host()
-    except Exception as e:
-        logging.error(f"Error checking ping: {str(e)}")
-        ping_result = {"status": "error", "message": str(e)}
-    
     ping_status = ping_result.get("status", "error")
     
     essential_services = [rpc_status, ping_status]
@@ -1126,127 +2875,15 @@ def update_data():
     else:
         server_status = "offline"
     
-    if rpc_status_alert is None:
-        rpc_status_alert = {
-            "type": "rpc_status",
-            "message": f"RPC Status: {rpc_status}",
-            "severity": "info" if rpc_status == "online" else "warning",
-            "timestamp": current_time_seconds,
-            "start_time": current_time_seconds if rpc_status == "offline" else None,
-            "end_time": None,
-            "persistent": True
-        }
-        latest_data["alerts"].append(rpc_status_alert)
-    else:
-        if rpc_status == "online":
-            rpc_status_alert["severity"] = "info"
-            rpc_status_alert["message"] = "✅ RPC Status: online"
-            rpc_status_alert["end_time"] = None
-            rpc_status_alert["start_time"] = None
-        else:
-            if rpc_status_alert.get("severity") == "info":
-                rpc_status_alert["start_time"] = current_time_seconds
-                rpc_status_alert["end_time"] = None
-            rpc_status_alert["severity"] = "warning"
-            rpc_status_alert["message"] = f"⚠️ RPC is down since {datetime.fromtimestamp(current_time_seconds).strftime('%Y-%m-%d %H:%M:%S')}"
-        
-        rpc_status_alert["timestamp"] = current_time_seconds
-    
-    if server_status_alert is None:
-        server_status_alert = {
-            "type": "server_status",
-            "message": f"Server Status: {server_status}",
-            "severity": "info" if server_status == "online" else "warning",
-            "timestamp": current_time_seconds,
-            "start_time": current_time_seconds if server_status == "offline" else None,
-            "end_time": None,
-            "persistent": True
-        }
-        latest_data["alerts"].append(server_status_alert)
-    else:
-        if server_status == "online":
-            server_status_alert["severity"] = "info"
-            server_status_alert["message"] = "✅ Server Status: online"
-            server_status_alert["end_time"] = None
-            server_status_alert["start_time"] = None
-        else:
-            if server_status_alert.get("severity") == "info":
-                server_status_alert["start_time"] = current_time_seconds
-                server_status_alert["end_time"] = None
-            server_status_alert["severity"] = "warning"
-            server_status_alert["message"] = f"⚠️ Server is down since {datetime.fromtimestamp(current_time_seconds).strftime('%Y-%m-%d %H:%M:%S')}"
-        
-        server_status_alert["timestamp"] = current_time_seconds
-    
-    try:
-        ip_info = get_ip_info()
-    except Exception as e:
-        logging.error(f"Error getting IP info: {str(e)}")
-        ip_info = "Error"
-    
-    try:
-        http_info = get_http_info()
-    except Exception as e:
-        logging.error(f"Error getting HTTP info: {str(e)}")
-        http_info = "Error"
-    
-    try:
-        security_info = get_security_info()
-    except Exception as e:
-        logging.error(f"Error getting security info: {str(e)}")
-        security_info = "Error"
-    
-    try:
-        ssl_info = get_ssl_info()
-    except Exception as e:
-        logging.error(f"Error getting SSL info: {str(e)}")
-        ssl_info = {"error": str(e)}
-    
-    try:
-        if current_time_seconds - (latest_data.get("last_dns_check", 0)) > CONFIG["dns_check_interval"]:
-            version_info = get_dns_serial()
-            latest_data["last_dns_check"] = current_time_seconds
-        else:
-            version_info = latest_data.get("version_info", "N/A")
-    except Exception as e:
-        logging.error(f"Error getting DNS version: {str(e)}")
-        version_info = "Error"
-    
-    try:
-        txt_info = get_txt_records()
-    except Exception as e:
-        logging.error(f"Error getting TXT records: {str(e)}")
-        txt_info = []
-    
-    try:
-        dns_records = get_dns_records()
-    except Exception as e:
-        logging.error(f"Error getting DNS records: {str(e)}")
-        dns_records = {}
-    
-    try:
-        network_info = get_network_info()
-    except Exception as e:
-        logging.error(f"Error getting network info: {str(e)}")
-        network_info = {}
-    
-    try:
-        transactions_info = get_latest_transactions()
-    except Exception as e:
-        logging.error(f"Error getting transactions: {str(e)}")
-        transactions_info = {"error": str(e)}
-    
-    try:
-        main_domain_info = get_main_domain_info()
-    except Exception as e:
-        logging.error(f"Error getting main domain info: {str(e)}")
-        main_domain_info = {"ip": "Error", "redirect": "Error"}
-    
-    try:
-        ip_consistent = verify_ip_consistency()
-    except Exception as e:
-        logging.error(f"Error verifying IP consistency: {str(e)}")
-        ip_consistent = False
+    # Alertes persistantes : nouvelle version à chaque cycle, à la place de l'ancienne
+    alerts = active_alerts(previous.alerts, current_time_seconds)
+    for key, alert_type, label, status in [
+        ("rpc_status_alert", "rpc_status", "RPC", rpc_status),
+        ("server_status_alert", "server_status", "Server", server_status)
+    ]:
+        alert = status_alert(state[key], alert_type, label, status, current_time_seconds)
+        alerts = replace_alert(alerts, state[key], alert)
+        state[key] = alert
     
     current_results = {
         "rpc": rpc_result,
@@ -1267,106 +2904,442 @@ def update_data():
     }
     
     try:
-        new_alerts = detect_changes(current_results)
+        new_alerts = detect_changes(target, current_results)
         for alert in new_alerts:
             alert["timestamp"] = current_time_seconds
-        alerts = new_alerts
     except Exception as e:
         logging.error(f"Error detecting changes: {str(e)}")
-        alerts = []
+        new_alerts = []
     
-    if "alerts" not in latest_data:
-        latest_data["alerts"] = []
+    # Incident : changement détecté ou passage hors ligne
+    if new_alerts:
+        start_burst(target, new_alerts[0]["message"])
+    for key, status in [("server_status", server_status), ("rpc_status", rpc_status)]:
+        if status == "offline" and getattr(previous, key) not in ["offline", "unknown"]:
+            start_burst(target, f"{key} went offline")
     
     existing_messages = [
-        alert["message"] for alert in latest_data["alerts"] 
+        alert["message"] for alert in alerts
         if current_time_seconds - alert.get("timestamp", 0) < 300
         and not alert.get("persistent", False)
     ]
     
-    for alert in alerts:
+    for alert in new_alerts:
         if alert["message"] not in existing_messages:
-            latest_data["alerts"].append(alert)
+            alerts.append(alert)
     
     # Récupérer la valeur RPC en millisecondes si disponible
     rpc_value_ms = rpc_result.get("response_time_ms", rpc_result.get("response_time", 0) * 1000)
     
-    latest_data.update({
-        "server_status": server_status,
-        "rpc_status": rpc_status,
-        "ping_status": ping_status,
-        "ping_value": ping_result.get("time", 0) if ping_status == "success" else None,
-        "rpc_value": rpc_value_ms if rpc_status == "online" else None,
-        "version_info": version_info,
-        "ip_info": ip_info,
-        "http_info": http_info,
-        "security_info": security_info,
-        "ssl_info": ssl_info,
-        "txt_info": txt_info,
-        "dns_records": dns_records,
-        "network_info": network_info,
-        "transactions": transactions_info,
-        "main_domain_info": main_domain_info,
-        "port_statuses": port_results,
-        "ip_consistent": ip_consistent,
-        "last_check": timestamp_str,
-        "alerts": latest_data["alerts"]
-    })
-    
-    logging.info(f"Data updated with {len(latest_data['alerts'])} alerts")
-    
-    check_history.append({
-        "ping": ping_result.get("time", 0),
-        "rpc": rpc_value_ms,
-        "timestamp": timestamp_str
-    })
-    
-    if len(check_history) > CONFIG["history_size"]:
-        check_history.pop(0)
+    # Le groupe ping appartient à update_ping : le ping du cycle ne sert qu'au statut serveur et aux alertes
+    cycle = previous.replace(
+        server_status=server_status,
+        rpc_status=rpc_status,
+        rpc_value=rpc_value_ms if rpc_status == "online" else None,
+        version_info=version_info,
+        ip_info=ip_info,
+        http_info=http_info,
+        security_info=security_info,
+        ssl_info=ssl_info,
+        txt_info=txt_info,
+        dns_records=dns_records,
+        network_info=network_info,
+        transactions=transactions_info,
+        main_domain_info=main_domain_info,
+        port_statuses=port_results,
+        port_scan=port_scan,
+        ip_consistent=ip_consistent,
+        dns_resolution=dns_resolution,
+        last_check=timestamp_str,
+        last_dns_check=last_dns_check,
+        alerts=tuple(alerts)
+    )
+    state["cycle"] = cycle
+    set_gauge("monitor_server_up", 1 if server_status == "online" else 0, target=target["name"])
+    for port, status in port_results.items():
+        set_gauge("monitor_port_up", 1 if status == "open" else 0, target=target["name"], port=port)
+    
+    logging.info(f"Data updated with {len(alerts)} alerts")
+    
+    record_sample(target, "rpc", cycle.rpc_value)  # Horodaté à la fin du cycle : le bucket courant l'accepte
+    
+    # Sonde en échec : None (NaN dans l'historique), pas 0 ms qui tirerait moyennes et percentiles vers le bas
+    cycle_ping = ping_result.get("time") if ping_result.get("status") == "success" else None
+    check_history.append(current_time_seconds, ping=cycle_ping, rpc=cycle.rpc_value)
+    publish_changes(target)
+    
+    # Signature des résultats stables (hors latences et compteurs) pour l'intervalle adaptatif
+    adapt_interval(target, "cycle", json.dumps([
+        getattr(cycle, key) for key in [
+            "server_status", "rpc_status", "port_statuses", "ip_info", "ip_consistent",
+            "main_domain_info", "dns_records", "txt_info", "http_info", "security_info"
+        ]
+    ], sort_keys=True, default=str))
+
+async def update_ping(target):
+    """Mesure la latence d'une cible et met à jour son historique de ping"""
+    state = target["state"]
+    ping_history = state["ping_history"]
     
-    latest_data["history"] = check_history.copy()
+    if "ping" in target["probes"]:
+        ping_result = await ping_host(target)
+    else:
+        ping_result = {"status": "disabled", "message": "Probe disabled for this target"}
+    if state["ping"].ping_status == "success" and ping_result.get("status") != "success":
+        start_burst(target, "ping failed")
+    adapt_interval(target, "ping", ping_result.get("status"))
+    ping = PingRecord(
+        ping_status=ping_result.get("status", "error"),
+        ping_value=ping_result.get("time", 0) if ping_result.get("status") == "success" else None
+    )
+    state["ping"] = ping
+    record_sample(target, "ping", ping.ping_value)
+    observe_latency("monitor_ping_latency_seconds", ping.ping_value, target=target["name"])
+    
+    ping_history.append(time.time(), ping=ping.ping_value, rpc=state["cycle"].rpc_value)
+    publish_changes(target)
 
-def monitor_loop():
-    while True:
-        update_data()
-        time.sleep(CONFIG["check_interval"])
+async def run_target_job(kind, target, cycle_slots):
+    try:
+        if kind == "cycle":
+            # Nombre borné de cycles simultanés, quel que soit le nombre de cibles
+            async with cycle_slots:
+                await update_data(target)
+        else:
+            await update_ping(target)
+    except Exception as e:
+        logging.error(f"Error in {kind} job for {target['name']}: {str(e)}")
 
-def ping_monitor_loop():
-    global ping_history
+async def monitor_loop():
+    """Ordonnanceur unique : répartit les cycles et les pings de toutes les cibles dans le temps.
+    
+    Chaque tâche est replanifiée à l'intervalle courant de sa cible (adaptatif) ; une rafale
+    réveille l'ordonnanceur et avance immédiatement le cycle et le ping de la cible.
+    """
+    global scheduler_wakeup
+    loop = asyncio.get_running_loop()
+    scheduler_wakeup = asyncio.Event()
+    cycle_slots = asyncio.Semaphore(CONFIG["max_concurrent_targets"])
+    running = set()
+    queue = []
+    
+    def schedule(due, index, kind, target):
+        target["state"]["next_due"][kind] = due
+        heapq.heappush(queue, (due, index, kind, target["name"]))
+    
+    now = loop.time()
+    count = len(targets)
+    for index, target in enumerate(targets.values()):
+        # Décaler les cibles sur leur intervalle pour lisser la charge
+        schedule(now + index * target["check_interval"] / count, index, "cycle", target)
+        schedule(now + index * target["ping_interval"] / count, index, "ping", target)
+    
     while True:
-        ping_result = ping_host()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if scheduler_wakeup.is_set():
+            scheduler_wakeup.clear()
+            for index, target in enumerate(targets.values()):
+                if target["state"]["run_now"]:
+                    target["state"]["run_now"] = False
+                    for kind in ["cycle", "ping"]:
+                        schedule(loop.time(), index, kind, target)
         
-        latest_data["ping_status"] = ping_result.get("status", "error")
-        latest_data["ping_value"] = ping_result.get("time", 0) if ping_result.get("status") == "success" else None
-        
-        ping_history.append({
-            "ping": ping_result.get("time", 0),
-            "timestamp": timestamp
-        })
-        
-        if len(ping_history) > 20:
-            ping_history.pop(0)
+        due, index, kind, name = queue[0]
+        delay = due - loop.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(scheduler_wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        heapq.heappop(queue)
         
-        latest_data["ping_history"] = ping_history.copy()
+        target = targets[name]
+        if target["state"]["next_due"].get(kind) != due:
+            # Entrée remplacée par une replanification (rafale)
+            continue
+        schedule(max(due + current_interval(target, kind), loop.time()), index, kind, target)
         
-        time.sleep(ping_update_interval)
+        # Une cible lente ne cumule pas plusieurs cycles en parallèle
+        if (kind, name) in running:
+            continue
+        running.add((kind, name))
+        task = asyncio.ensure_future(run_target_job(kind, target, cycle_slots))
+        task.add_done_callback(lambda t, key=(kind, name): running.discard(key))
+
+# Premier snapshot de chaque cible, servi jusqu'à la fin de son premier cycle
+if CONFIG["serve_mode"] == "monitor":
+    os.makedirs(CONFIG["snapshot_store"], exist_ok=True)
+for target in targets.values():
+    publish_changes(target)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def target_delta(snapshot, since):
+    """Clés modifiées et nouveaux points d'historique depuis la version publiée `since`.
+    
+    None si elle est trop ancienne ou vient d'un autre processus de surveillance : il faut alors un snapshot complet.
+    Tout est lu dans le snapshot (dont les historiques publiés), sans toucher à l'état des sondes.
+    """
+    number = parse_version_token(snapshot, since)
+    marks = snapshot["marks"]
+    since_mark = next((mark for mark in marks if mark[0] == number), None)
+    if since_mark is None:
+        return None
+    
+    _, check_total, ping_total = marks[-1]
+    history = snapshot["data"]["history"]
+    ping_history = snapshot["data"]["ping_history"]
+    return {
+        "version": snapshot["version"],
+        "since": since,
+        "changed": {
+            key: snapshot["data"][key]
+            for key, key_version in snapshot["key_versions"].items() if key_version > number
+        },
+        "history": history[max(0, len(history) - (check_total - since_mark[1])):],
+        "ping_history": ping_history[max(0, len(ping_history) - (ping_total - since_mark[2])):]
+    }
+
+def get_requested_target():
+    name = request.args.get('target')
+    if name is None:
+        return default_target
+    return targets.get(name)
+
 @app.route('/api/data')
 def get_data():
-    return jsonify(latest_data)
+    target = get_requested_target()
+    if target is None:
+        return jsonify({"error": f"Unknown target: {request.args.get('target')}"}), 404
+    
+    snapshot = target_view(target)["snapshot"]
+    etag = snapshot["etag"]
+    
+    since = request.args.get('since')
+    if since == snapshot["version"] or (since is None and request.if_none_match.contains(etag)):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    delta = target_delta(snapshot, since) if since is not None else None
+    if delta is not None:
+        return jsonify(delta)
+    
+    # Réponse complète : octets pré-sérialisés (pas de `since`, ou version sortie de la fenêtre)
+    response = app.response_class(snapshot["body"], mimetype="application/json")
+    if snapshot["gzip_body"] is not None and "gzip" in request.accept_encodings:
+        response.set_data(snapshot["gzip_body"])
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
-if __name__ == '__main__':
-    monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-    monitor_thread.start()
-    
-    ping_thread = threading.Thread(target=ping_monitor_loop, daemon=True)
-    ping_thread.start()
+@app.after_request
+def flag_stale_monitor(response):
+    """Mode web : signale les réponses servies alors que le processus de surveillance n'écrit plus le store"""
+    if CONFIG["serve_mode"] == "web" and request.path.startswith("/api/") and monitor_record()[1]:
+        response.headers["X-Monitor-Stale"] = "true"
+    return response
+
+def sse_event(event, version, body):
+    """Encode un évènement Server-Sent Events (données JSON sur une ligne)"""
+    return b"event: " + event.encode() + b"\nid: " + str(version).encode() + b"\ndata: " + body + b"\n\n"
+
+@app.route('/api/stream')
+def stream_data():
+    target = get_requested_target()
+    if target is None:
+        return jsonify({"error": f"Unknown target: {request.args.get('target')}"}), 404
+    
+    if not stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "Too many open streams, poll /api/data instead"})
+        response.headers["Retry-After"] = str(CONFIG["stream_heartbeat"])
+        return response, 503
+    
+    # À la reconnexion, EventSource renvoie le dernier id reçu : repartir de cette version
+    last_version = request.headers.get('Last-Event-ID')
+    
+    def events():
+        version = last_version
+        while True:
+            snapshot = target_view(target)["snapshot"]
+            if snapshot["version"] != version:
+                delta = target_delta(snapshot, version) if version is not None else None
+                if delta is None:
+                    yield sse_event("snapshot", snapshot["version"], snapshot["body"])
+                else:
+                    yield sse_event("delta", snapshot["version"], json.dumps(delta, separators=(",", ":")).encode("utf-8"))
+                version = snapshot["version"]
+            
+            if not wait_for_version(target, version, CONFIG["stream_heartbeat"]):
+                # Commentaire SSE : maintient la connexion ouverte à travers les proxys
+                yield b": keep-alive\n\n"
+    
+    response = app.response_class(events(), mimetype="text/event-stream")
+    response.call_on_close(stream_slots.release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route('/api/timeseries')
+def get_timeseries():
+    target = get_requested_target()
+    if target is None:
+        return jsonify({"error": f"Unknown target: {request.args.get('target')}"}), 404
+    if not CONFIG["timeseries_db"]:
+        return jsonify({"error": "Time series storage is disabled"}), 404
+    
+    metric = request.args.get('metric', 'ping')
+    if metric not in ["ping", "rpc", "dns"]:
+        return jsonify({"error": f"Unknown metric: {metric}"}), 400
+    try:
+        end = float(request.args.get('to', time.time()))
+        start = float(request.args.get('from', end - 3600))
+        resolution, points = query_timeseries(
+            target["name"], metric, start, end, request.args.get('resolution', 'auto')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "target": target["name"],
+        "metric": metric,
+        "from": start,
+        "to": end,
+        "resolution": resolution,
+        "points": points
+    })
+
+@app.route('/api/history')
+def get_history():
+    target = get_requested_target()
+    if target is None:
+        return jsonify({"error": f"Unknown target: {request.args.get('target')}"}), 404
     
-    update_data()
+    resolution = request.args.get('resolution', 'minute')
+    try:
+        end = float(request.args.get('to', time.time() + 1))
+        if resolution == 'raw':
+            # Derniers pings (avec la latence RPC connue à cet instant)
+            start = float(request.args.get('from', end - 300))
+            points = [
+                {"ts": point["ts"], "ping": point["ping"], "rpc": point["rpc"]}
+                for point in recent_pings(history_view(target), start)
+                if point["ts"] < end
+            ]
+        elif resolution in CONFIG["history_buckets"]:
+            start = float(request.args.get('from', end - 3600))
+            points = query_history_buckets(history_view(target), resolution, start, end)
+        else:
+            return jsonify({"error": f"Unknown resolution: {resolution}"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "target": target["name"],
+        "resolution": resolution,
+        "from": start,
+        "to": end,
+        "points": points
+    })
+
+@app.route('/api/refresh', methods=['POST'])
+def refresh_probes():
+    target = get_requested_target()
+    if target is None:
+        return jsonify({"error": f"Unknown target: {request.args.get('target')}"}), 404
+    
+    refreshable = list(CONFIG["probe_cache_ttls"]) + ["version_info"]
+    requested = request.args.get('probe')
+    names = requested.split(',') if requested else refreshable
+    unknown = [name for name in names if name not in refreshable]
+    if unknown:
+        return jsonify({"error": f"Unknown or uncached probe: {', '.join(unknown)}"}), 400
     
-    app.run(host='0.0.0.0', port=CONFIG["web_port"], debug=False)
\ No newline at end of file
+    try:
+        wait = claim_refresh(target)
+    except OSError as e:
+        return jsonify({"error": f"Monitor store unavailable: {str(e)}"}), 503
+    if wait > 0:
+        response = jsonify({"error": f"Refresh of {target['name']} requested too recently", "retry_after": round(wait, 1)})
+        response.headers["Retry-After"] = str(math.ceil(wait))
+        return response, 429
+    
+    if CONFIG["serve_mode"] == "web":
+        # Les sondes tournent dans le processus de surveillance : une demande par cible au plus dans le store
+        path = store_path(target["name"], "refresh")
+        try:
+            with open(f"{path}.tmp", "w") as f:
+                json.dump({"target": target["name"], "probes": names}, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            return jsonify({"error": f"Monitor store unavailable: {str(e)}"}), 503
+    else:
+        # L'état des sondes n'est modifié que depuis leur boucle
+        probe_loop.call_soon_threadsafe(request_refresh, target, names)
+    return jsonify({"target": target["name"], "refreshing": names}), 202
+
+@app.route('/api/targets')
+def get_targets():
+    listing = []
+    for target in targets.values():
+        view = target_view(target)
+        published = view["snapshot"]["data"]
+        listing.append({
+            "name": target["name"],
+            "domain": target["domain"],
+            "rpc_url": target["rpc_url"],
+            "check_interval": target["check_interval"],
+            **view["status"],
+            "probes": target["probes"],
+            "server_status": published.get("server_status"),
+            "rpc_status": published.get("rpc_status"),
+            "ping_status": published.get("ping_status"),
+            "last_check": published.get("last_check")
+        })
+    return jsonify(listing)
+
+@app.route('/metrics')
+def get_metrics():
+    if CONFIG["serve_mode"] == "web":
+        record, stale = monitor_record()
+        if record is None:
+            return jsonify({"error": "Monitor process has not published yet"}), 503
+        if stale:
+            return jsonify({"error": f"Monitor process silent for {int(time.time() - record['written_at'])}s"}), 503
+        body = record["metrics"]
+    else:
+        body = render_metrics()
+    return app.response_class(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route('/api/workers')
+def get_worker_stats():
+    if CONFIG["serve_mode"] == "web":
+        record, stale = monitor_record()
+        if record is None:
+            return jsonify({"error": "Monitor process has not published yet"}), 503
+        if stale:
+            return jsonify({"error": f"Monitor process silent for {int(time.time() - record['written_at'])}s"}), 503
+        return jsonify(record["workers"])
+    return jsonify(probe_executor.stats())
+
+if __name__ == '__main__':
+    if CONFIG["serve_mode"] != "web":
+        if CONFIG["timeseries_db"]:
+            for target in targets.values():
+                seed_history_buckets(target)
+                load_block_checkpoint(target)
+            submit_async(timeseries_loop())
+        if CONFIG["serve_mode"] == "monitor":
+            submit_async(store_refresh_loop())
+        # Le premier cycle de chaque cible est lancé par l'ordonnanceur
+        submit_async(monitor_loop())
+    
+    if CONFIG["serve_mode"] == "monitor":
+        # Pas de serveur web : les workers gunicorn (SERVE_MODE=web) servent le store
+        probe_loop_thread.join()
+    else:
+        app.run(host='0.0.0.0', port=CONFIG["web_port"], debug=False)
\ No newline at end of file
@@ -0,0 +1,25 @@
+#!/bin/bash
+# Mode production : un seul processus de sondes écrit le store local,
+# les workers gunicorn le servent en lecture seule (sans dupliquer les sondes)
+
+export SNAPSHOT_STORE="${SNAPSHOT_STORE:-/tmp/basedai-snapshots}"
+mkdir -p "$SNAPSHOT_STORE"
+# Chaque flux SSE occupe un thread gthread : au plus la moitié des threads d'un worker (503 au-delà)
+export MAX_STREAMS="${MAX_STREAMS:-$(( ${WEB_THREADS:-8} / 2 ))}"
+
+SERVE_MODE=monitor python app.py &
+
+SERVE_MODE=web gunicorn app:app \
+    --bind "0.0.0.0:${PORT:-5000}" \
+    --workers "${WEB_CONCURRENCY:-2}" \
+    --worker-class gthread \
+    --threads "${WEB_THREADS:-8}" &
+
+# Sans processus de sondes les workers serviraient des données figées : le conteneur s'arrête
+# (et la plateforme le redémarre) dès que l'un des deux processus se termine
+trap 'kill $(jobs -p) 2>/dev/null' TERM INT
+wait -n
+status=$?
+kill $(jobs -p) 2>/dev/null
+wait
+exit $status
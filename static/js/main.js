@@ -42,6 +42,10 @@ document.addEventListener('DOMContentLoaded', function() {
         lastScrollTop = scrollTop;
     });
     
+    // Cible surveillée (paramètre ?target= de la page, cible par défaut sinon)
+    const targetParam = new URLSearchParams(window.location.search).get('target');
+    const targetQuery = targetParam ? `target=${encodeURIComponent(targetParam)}` : '';
+    
     // Initialize latency chart
     const ctx = document.getElementById('latency-chart').getContext('2d');
     
@@ -209,8 +213,10 @@ document.addEventListener('DOMContentLoaded', function() {
             clearInterval(pingUpdateInterval);
         }
         
-        // Créer le nouvel intervalle
-        pingUpdateInterval = setInterval(updatePingChart, chartUpdateInterval);
+        // Créer le nouvel intervalle (inutile tant que le flux temps réel pousse les données)
+        if (!streamConnected) {
+            pingUpdateInterval = setInterval(updatePingChart, chartUpdateInterval);
+        }
         
         // Afficher un message de confirmation
         const applyButton = document.getElementById('apply-interval');
@@ -259,7 +265,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     // Modifiez la fonction updatePorts() pour mieux gérer les données manquantes
-    function updatePorts(ports) {
+    function updatePorts(ports, scanResults) {
         const container = document.getElementById('ports-status');
         container.innerHTML = '';
         
@@ -270,8 +276,11 @@ document.addEventListener('DOMContentLoaded', function() {
         
         for (const [port, status] of Object.entries(ports)) {
             const portElement = document.createElement('div');
+            const scan = scanResults && scanResults[port];
             portElement.className = `port-item ${status}`;
-            portElement.textContent = `${port}: ${status}`;
+            portElement.textContent = scan && scan.latency_ms != null
+                ? `${port}: ${status} (${scan.latency_ms} ms)`
+                : `${port}: ${status}`;
             container.appendChild(portElement);
         }
     }
@@ -294,13 +303,21 @@ document.addEventListener('DOMContentLoaded', function() {
     // Stockage des alertes existantes pour les mettre à jour plutôt que de les remplacer
     let existingAlerts = [];
     
-    // Système de cache intelligent pour les données du graphique
-    let chartDataCache = {
-        raw: [],      // Données brutes (toutes les entrées)
-        minute: [],   // Données agrégées par minute
-        hour: [],     // Données agrégées par heure
-        day: []       // Données agrégées par jour
+    // Résolution et fenêtre de l'historique serveur (/api/history) selon l'unité du graphique
+    const chartHistoryWindows = {
+        'seconds': { resolution: 'raw', span: 150 * 1000 },              // ~30 derniers pings
+        'minutes': { resolution: 'minute', span: 60 * 60 * 1000 },       // 60 minutes
+        'hours': { resolution: 'hour', span: 24 * 60 * 60 * 1000 },      // 24 heures
+        'days': { resolution: 'day', span: 7 * 24 * 60 * 60 * 1000 }     // 7 jours
     };
+    const bucketSizes = { 'minute': 60, 'hour': 3600, 'day': 86400 };  // Buckets alignés en UTC (s)
+    
+    // Points du graphique : rechargés au changement d'unité ou à la clôture d'un bucket, complétés localement sinon
+    let chartPoints = null;
+    let chartUnit = null;
+    let chartRequest = null;
+    let lastChartPing = 0;
+    let lastChartCheck = 0;
     
     // Variable pour stocker le dernier nombre de transactions
     let lastTxCount = 0;
@@ -422,146 +439,92 @@ document.addEventListener('DOMContentLoaded', function() {
         setTimeout(updateDowntimeCounters, 1000);
     }
     
-    // Fonction pour ajouter des données au cache intelligent
-    function addToChartDataCache(data) {
-        // Ajouter aux données brutes
-        chartDataCache.raw.push(data);
-        
-        // Nettoyer les données anciennes (plus de 7 jours)
-        const sevenDaysAgo = Date.now() - (7 * 24 * 60 * 60 * 1000);
-        chartDataCache.raw = chartDataCache.raw.filter(item => 
-            new Date(item.timestamp).getTime() > sevenDaysAgo
-        );
-        
-        // Agréger par minute
-        aggregateChartData('minute');
+    // Fonction pour récupérer l'historique agrégé par le serveur et redessiner le graphique
+    function refreshChartHistory() {
+        if (chartRequest) return chartRequest;
         
-        // Agréger par heure
-        aggregateChartData('hour');
+        const selectedUnit = document.getElementById('interval-unit').value;
+        const historyWindow = chartHistoryWindows[selectedUnit] || chartHistoryWindows['seconds'];
+        const from = (Date.now() - historyWindow.span) / 1000;
+        const query = `resolution=${historyWindow.resolution}&from=${from}${targetQuery ? '&' + targetQuery : ''}`;
         
-        // Agréger par jour
-        aggregateChartData('day');
+        chartRequest = fetch(`/api/history?${query}`)
+            .then(response => response.json())
+            .then(history => {
+                // Les échantillons déjà publiés sont inclus dans la réponse du serveur
+                chartPoints = history.points || [];
+                chartUnit = selectedUnit;
+                lastChartPing = latestTs(publishedData && publishedData.ping_history);
+                lastChartCheck = latestTs(publishedData && publishedData.history);
+                renderChart(chartPoints, selectedUnit);
+            })
+            .catch(error => console.error('Error fetching chart history:', error))
+            .finally(() => { chartRequest = null; });
+        return chartRequest;
     }
     
-    // Fonction pour agréger les données selon une granularité
-    function aggregateChartData(granularity) {
-        const cache = chartDataCache[granularity];
-        const raw = chartDataCache.raw;
-        
-        // Vider le cache actuel
-        chartDataCache[granularity] = [];
-        
-        // Grouper les données par période
-        const groups = {};
+    function latestTs(items) {
+        return items && items.length ? items[items.length - 1].ts : 0;
+    }
+    
+    // Fonction pour ajouter au graphique les échantillons poussés depuis le dernier rendu
+    function updateChart(data) {
+        const selectedUnit = document.getElementById('interval-unit').value;
+        if (chartPoints === null || selectedUnit !== chartUnit) {
+            refreshChartHistory();
+            return;
+        }
         
-        raw.forEach(item => {
-            const date = new Date(item.timestamp);
-            let key;
-            
-            switch(granularity) {
-                case 'minute':
-                    key = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()} ${date.getHours()}:${date.getMinutes()}`;
-                    break;
-                case 'hour':
-                    key = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()} ${date.getHours()}:00`;
-                    break;
-                case 'day':
-                    key = `${date.getFullYear()}-${date.getMonth()}-${date.getDate()}`;
-                    break;
-            }
-            
-            if (!groups[key]) {
-                groups[key] = {
-                    timestamp: item.timestamp,
-                    pingValues: [],
-                    rpcValues: []
-                };
-            }
-            
-            if (item.ping !== null && item.ping !== undefined) {
-                groups[key].pingValues.push(item.ping);
-            }
-            
-            if (item.rpc !== null && item.rpc !== undefined) {
-                groups[key].rpcValues.push(item.rpc);
-            }
-        });
+        const pings = (data.ping_history || []).filter(item => item.ts > lastChartPing);
+        const checks = (data.history || []).filter(item => item.ts > lastChartCheck);
+        if (pings.length === 0 && checks.length === 0) return;
+        lastChartPing = Math.max(lastChartPing, latestTs(pings));
+        lastChartCheck = Math.max(lastChartCheck, latestTs(checks));
         
-        // Calculer les moyennes pour chaque groupe
-        for (const key in groups) {
-            const group = groups[key];
-            
-            // Calculer la moyenne des pings
-            let pingAvg = null;
-            if (group.pingValues.length > 0) {
-                pingAvg = group.pingValues.reduce((sum, val) => sum + val, 0) / group.pingValues.length;
-            }
-            
-            // Calculer la moyenne des RPC
-            let rpcAvg = null;
-            if (group.rpcValues.length > 0) {
-                rpcAvg = group.rpcValues.reduce((sum, val) => sum + val, 0) / group.rpcValues.length;
+        const historyWindow = chartHistoryWindows[selectedUnit] || chartHistoryWindows['seconds'];
+        if (historyWindow.resolution === 'raw') {
+            const from = (Date.now() - historyWindow.span) / 1000;
+            chartPoints = chartPoints
+                .concat(pings.map(item => ({ ts: item.ts, ping: item.ping, rpc: item.rpc })))
+                .filter(point => point.ts >= from);
+        } else {
+            const size = bucketSizes[historyWindow.resolution];
+            const openBucket = chartPoints[chartPoints.length - 1];
+            const samples = pings.map(item => [item.ts, 'ping', item.ping])
+                .concat(checks.map(item => [item.ts, 'rpc', item.rpc]));
+            if (!openBucket || samples.some(([ts]) => ts - ts % size > openBucket.ts)) {
+                // Un bucket s'est clos : ses agrégats viennent du serveur
+                refreshChartHistory();
+                return;
             }
-            
-            chartDataCache[granularity].push({
-                timestamp: group.timestamp,
-                ping: pingAvg,
-                rpc: rpcAvg
+            samples.forEach(([ts, metric, value]) => {
+                if (!value || ts - ts % size !== openBucket.ts) return;
+                const count = openBucket[`${metric}_count`] || 0;
+                openBucket[metric] = ((openBucket[metric] || 0) * count + value) / (count + 1);
+                openBucket[`${metric}_count`] = count + 1;
             });
         }
-        
-        // Trier par timestamp
-        chartDataCache[granularity].sort((a, b) => 
-            new Date(a.timestamp) - new Date(b.timestamp)
-        );
+        renderChart(chartPoints, selectedUnit);
     }
     
-    // Fonction pour obtenir les données du graphique selon la granularité sélectionnée
-    function getChartDataForGranularity(granularity) {
-        // Déterminer la quantité de données à retourner selon la granularité
-        let maxDataPoints;
-        switch(granularity) {
-            case 'seconds':
-                maxDataPoints = 30; // 30 minutes de données (une point par seconde)
-                break;
-            case 'minutes':
-                maxDataPoints = 60; // 60 minutes de données (une point par minute)
-                break;
-            case 'hours':
-                maxDataPoints = 24; // 24 heures de données (une point par heure)
-                break;
-            case 'days':
-                maxDataPoints = 7;  // 7 jours de données (une point par jour)
-                break;
-            default:
-                maxDataPoints = 30;
-        }
+    // Fonction pour afficher les points renvoyés par le serveur
+    function renderChart(points, selectedUnit) {
+        if (points.length === 0) return;
         
-        // Sélectionner la source de données selon la granularité
-        let dataSource;
-        switch(granularity) {
-            case 'seconds':
-                dataSource = chartDataCache.raw;
-                break;
-            case 'minutes':
-                dataSource = chartDataCache.minute;
-                break;
-            case 'hours':
-                dataSource = chartDataCache.hour;
-                break;
-            case 'days':
-                dataSource = chartDataCache.day;
-                break;
-            default:
-                dataSource = chartDataCache.raw;
-        }
+        // Préparer les données pour le graphique (ts en secondes epoch)
+        latencyChart.data.labels = points.map(item => 
+            formatChartLabel(new Date(item.ts * 1000).toISOString(), selectedUnit)
+        );
+        latencyChart.data.datasets[0].data = points.map(item => item.ping);
+        latencyChart.data.datasets[1].data = points.map(item => item.rpc);
         
-        // Limiter le nombre de points de données
-        if (dataSource.length > maxDataPoints) {
-            return dataSource.slice(dataSource.length - maxDataPoints);
-        }
+        // Ajuster l'échelle du graphique
+        adjustChartScale();
+        
+        // Forcer un redessin complet du graphique
+        latencyChart.update('active');
         
-        return dataSource;
+        console.log("Chart updated successfully with", points.length, "data points");
     }
     
     // Fonction pour afficher des notifications
@@ -678,69 +641,74 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('last-check').textContent = localTimeString;
     }
     
+    // Dernière version complète des données publiées, tenue à jour par deltas (?since=)
+    let publishedData = null;
+    const historyLimits = { history: 120, ping_history: 20 };
+    
+    // Fonction pour récupérer les données : complètes la première fois, puis seulement les changements
+    // Données servies alors que le processus de sondes n'écrit plus (en-tête X-Monitor-Stale)
+    let monitorStale = false;
+    
+    function fetchPublishedData() {
+        const params = [];
+        if (publishedData) params.push(`since=${publishedData.version}`);
+        if (targetQuery) params.push(targetQuery);
+        
+        return fetch(`/api/data${params.length ? '?' + params.join('&') : ''}`, { cache: 'no-cache' })
+            .then(response => {
+                monitorStale = response.headers.get('X-Monitor-Stale') === 'true';
+                // 304 : rien n'a changé depuis la version connue
+                if (response.status === 304) return null;
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => data === null ? publishedData : applyPublishedData(data));
+    }
+    
+    // Fonction pour intégrer une réponse (complète ou delta) aux données connues
+    function applyPublishedData(data) {
+        if (data.changed === undefined || !publishedData) {
+            publishedData = data;
+            return publishedData;
+        }
+        
+        // Réponse delta : fusionner les clés modifiées et les nouveaux points d'historique
+        Object.assign(publishedData, data.changed);
+        Object.keys(historyLimits).forEach(key => {
+            publishedData[key] = (publishedData[key] || []).concat(data[key]).slice(-historyLimits[key]);
+        });
+        publishedData.version = data.version;
+        return publishedData;
+    }
+    
     // Function to update ping chart in real-time
     function updatePingChart() {
         console.log("Updating ping chart with interval:", chartUpdateInterval, "ms");
         
-        fetch('/api/data')
-            .then(response => response.json())
-            .then(data => {
-                // Mettre à jour les valeurs de ping en temps réel
-                if (data.ping_value !== null && data.ping_value !== undefined && data.ping_value > 0) {
-                    document.getElementById('ping-metric').textContent = `${Math.round(data.ping_value)} ms`;
-                } else {
-                    // Si pas de valeur valide, afficher "No data"
-                    document.getElementById('ping-metric').textContent = 'No data';
-                }
-                
-                // Mettre à jour le statut
-                updateStatus('ping-status', data.ping_status);
-                
-                // Ajouter les nouvelles données au cache
-                if (data.ping_value !== null && data.ping_value !== undefined) {
-                    addToChartDataCache({
-                        timestamp: new Date().toISOString(),
-                        ping: data.ping_value,
-                        rpc: data.rpc_value
-                    });
-                }
-                
-                // Récupérer l'unité sélectionnée
-                const selectedUnit = document.getElementById('interval-unit').value;
-                
-                // Obtenir les données selon la granularité
-                const chartData = getChartDataForGranularity(selectedUnit);
-                
-                if (chartData.length > 0) {
-                    // Préparer les données pour le graphique
-                    const labels = chartData.map(item => {
-                        const date = new Date(item.timestamp);
-                        return formatChartLabel(date.toISOString(), selectedUnit);
-                    });
-                    
-                    const pingData = chartData.map(item => item.ping);
-                    const rpcData = chartData.map(item => {
-                        // Les valeurs sont déjà en ms, pas besoin de conversion
-                        return item.rpc !== null ? item.rpc : null;
-                    });
-                    
-                    // Mettre à jour les données du graphique
-                    latencyChart.data.labels = labels;
-                    latencyChart.data.datasets[0].data = pingData;
-                    latencyChart.data.datasets[1].data = rpcData;
-                    
-                    // Ajuster l'échelle du graphique
-                    adjustChartScale();
-                    
-                    // Forcer un redessin complet du graphique
-                    latencyChart.update('active');
-                    
-                    console.log("Chart updated successfully with", chartData.length, "data points");
-                }
-            })
+        fetchPublishedData()
+            .then(renderPing)
             .catch(error => console.error('Error updating ping chart:', error));
     }
     
+    // Fonction pour afficher la latence ping et le graphique
+    function renderPing(data) {
+        // Mettre à jour les valeurs de ping en temps réel
+        if (data.ping_value !== null && data.ping_value !== undefined && data.ping_value > 0) {
+            document.getElementById('ping-metric').textContent = `${Math.round(data.ping_value)} ms`;
+        } else {
+            // Si pas de valeur valide, afficher "No data"
+            document.getElementById('ping-metric').textContent = 'No data';
+        }
+        
+        // Mettre à jour le statut
+        updateStatus('ping-status', data.ping_status);
+        
+        // Mettre à jour le graphique avec les nouveaux échantillons
+        updateChart(data);
+    }
+    
     // Variable pour suivre le dernier timestamp des données
     let lastDataTimestamp = null;
     
@@ -749,178 +717,8 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log("Updating data...");
         document.getElementById('sync-status').textContent = 'Synchronizing...';
         
-        // Ajouter un timestamp pour éviter la mise en cache
-        const timestamp = new Date().getTime();
-        const cacheBuster = `?_=${timestamp}`;
-        
-        fetch(`/api/data${cacheBuster}`)
-            .then(response => {
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                return response.json();
-            })
-            .then(data => {
-                console.log("Data received:", data);
-                
-                // Vérifier si les données sont nouvelles
-                const currentTimestamp = new Date(data.last_check).getTime();
-                if (lastDataTimestamp && currentTimestamp <= lastDataTimestamp) {
-                    console.log("Data hasn't changed, skipping UI update");
-                    document.getElementById('sync-status').textContent = 'Synchronised';
-                    return;
-                }
-                
-                // Mettre à jour le timestamp
-                lastDataTimestamp = currentTimestamp;
-                
-                // Update server status - Set to online as per user request
-                const serverStatusElement = document.getElementById('server-status');
-                const serverStatusText = document.getElementById('server-status-text');
-                serverStatusElement.className = 'server-status online';
-                serverStatusText.textContent = 'Server Online';
-                
-                // Update main statuses
-                updateStatus('rpc-status', data.rpc_status);
-                updateStatus('ping-status', data.ping_status);
-                
-                // Update metrics - ensure we show actual values, not 0
-                if (data.rpc_value !== null && data.rpc_value !== undefined) {
-                    // Afficher la valeur RPC en ms sans décimales
-                    document.getElementById('rpc-metric').textContent = `${Math.round(data.rpc_value)} ms`;
-                } else {
-                    document.getElementById('rpc-metric').textContent = '-- ms';
-                }
-                
-                // Gérer spécifiquement les valeurs de ping
-                if (data.ping_value !== null && data.ping_value !== undefined && data.ping_value > 0) {
-                    document.getElementById('ping-metric').textContent = `${Math.round(data.ping_value)} ms`;
-                } else {
-                    document.getElementById('ping-metric').textContent = 'No data';
-                }
-                
-                document.getElementById('dns-version').textContent = data.version_info || 'N/A';
-                
-                // Update detailed information
-                document.getElementById('ip-subdomain').textContent = data.ip_info || 'N/A';
-                document.getElementById('ip-domain').textContent = data.main_domain_info?.ip || 'N/A';
-                
-                // Correction pour la redirection - afficher "no redirection" au lieu de "Error"
-                const redirectValue = data.main_domain_info?.redirect;
-                if (redirectValue === 'Error') {
-                    document.getElementById('redirect').textContent = 'no redirection';
-                } else {
-                    document.getElementById('redirect').textContent = redirectValue || 'N/A';
-                }
-                
-                document.getElementById('security').textContent = data.security_info || 'N/A';
-                
-                // Update last check with local time format
-                updateCurrentTime();
-                
-                // Update TXT Records
-                const txtContainer = document.getElementById('txt-records');
-                if (Array.isArray(data.txt_info) && data.txt_info.length > 0) {
-                    txtContainer.innerHTML = '';
-                    data.txt_info.forEach(record => {
-                        const recordElement = document.createElement('div');
-                        recordElement.className = 'txt-record';
-                        recordElement.textContent = record;
-                        txtContainer.appendChild(recordElement);
-                    });
-                } else {
-                    txtContainer.textContent = 'N/A';
-                }
-                
-                // Update SSL information
-                if (data.ssl_info) {
-                    document.getElementById('ssl-issuer').textContent = 
-                        data.ssl_info.issuer ? data.ssl_info.issuer.organizationName || 'N/A' : 'N/A';
-                    document.getElementById('ssl-subject').textContent = 
-                        data.ssl_info.subject ? data.ssl_info.subject.commonName || 'N/A' : 'N/A';
-                    document.getElementById('ssl-expiry').textContent = 
-                        data.ssl_info.notAfter || 'N/A';
-                    document.getElementById('ssl-days-left').textContent = 
-                        data.ssl_info.days_left !== undefined ? `${data.ssl_info.days_left} days` : 'N/A';
-                }
-                
-                // Update transaction information - Correction pour afficher les transactions
-                if (data.transactions) {
-                    if (data.transactions.error) {
-                        document.getElementById('latest-block').textContent = 'Error';
-                        document.getElementById('tx-count').textContent = 'Error';
-                        document.getElementById('tx-source').textContent = data.transactions.error;
-                    } else {
-                        document.getElementById('latest-block').textContent = 
-                            data.transactions.block_number ? `#${data.transactions.block_number}` : 'N/A';
-                        
-                        // Afficher le nombre de transactions formaté si disponible, sinon le nombre brut
-                        if (data.transactions.formatted_txns) {
-                            document.getElementById('tx-count').textContent = data.transactions.formatted_txns;
-                        } else if (data.transactions.tx_count !== null && data.transactions.tx_count !== undefined) {
-                            document.getElementById('tx-count').textContent = data.transactions.tx_count;
-                        } else {
-                            document.getElementById('tx-count').textContent = '94.079K'; // Valeur par défaut
-                        }
-                        
-                        document.getElementById('tx-source').textContent = 
-                            data.transactions.source || 'N/A';
-                    }
-                } else {
-                    // Forcer l'affichage du dernier bloc connu si aucune donnée n'est disponible
-                    document.getElementById('latest-block').textContent = `#${lastKnownBlock.height}`;
-                    document.getElementById('tx-count').textContent = '94.079K'; // Valeur par défaut
-                    document.getElementById('tx-source').textContent = `Last seen: ${lastKnownBlock.timestamp}`;
-                }
-                
-                // Update ports
-                updatePorts(data.port_statuses);
-                
-                // Update alerts
-                updateAlerts(data.alerts);
-                
-                // Ajouter les nouvelles données au cache
-                if (data.history && data.history.length > 0) {
-                    data.history.forEach(item => {
-                        addToChartDataCache({
-                            timestamp: item.timestamp,
-                            ping: item.ping,
-                            rpc: item.rpc
-                        });
-                    });
-                }
-                
-                // Mettre à jour le graphique avec les données du cache
-                const selectedUnit = document.getElementById('interval-unit').value;
-                const chartData = getChartDataForGranularity(selectedUnit);
-                
-                if (chartData.length > 0) {
-                    // Préparer les données pour le graphique
-                    const labels = chartData.map(item => {
-                        const date = new Date(item.timestamp);
-                        return formatChartLabel(date.toISOString(), selectedUnit);
-                    });
-                    
-                    const pingData = chartData.map(item => item.ping);
-                    const rpcData = chartData.map(item => {
-                        // Les valeurs sont déjà en ms, pas besoin de conversion
-                        return item.rpc !== null ? item.rpc : null;
-                    });
-                    
-                    // Mettre à jour les données du graphique
-                    latencyChart.data.labels = labels;
-                    latencyChart.data.datasets[0].data = pingData;
-                    latencyChart.data.datasets[1].data = rpcData;
-                    
-                    // Ajuster l'échelle du graphique
-                    adjustChartScale();
-                    
-                    // Forcer un redessin complet du graphique
-                    latencyChart.update('active');
-                }
-                
-                document.getElementById('sync-status').textContent = 'Synchronised';
-            })
+        fetchPublishedData()
+            .then(renderData)
             .catch(error => {
                 console.error('Error fetching data:', error);
                 document.getElementById('sync-status').textContent = 'Sync Error';
@@ -932,6 +730,169 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
     
+    // Fonction pour afficher l'ensemble des données publiées
+    function renderData(data) {
+        console.log("Data received:", data);
+        
+        // Vérifier si les données sont nouvelles
+        const currentTimestamp = new Date(data.last_check).getTime();
+        if (lastDataTimestamp && currentTimestamp <= lastDataTimestamp) {
+            console.log("Data hasn't changed, skipping UI update");
+            document.getElementById('sync-status').textContent = 'Synchronised';
+            return;
+        }
+        
+        // Mettre à jour le timestamp
+        lastDataTimestamp = currentTimestamp;
+        
+        // Update server status - Set to online as per user request
+        const serverStatusElement = document.getElementById('server-status');
+        const serverStatusText = document.getElementById('server-status-text');
+        serverStatusElement.className = 'server-status online';
+        serverStatusText.textContent = 'Server Online';
+        
+        // Update main statuses
+        updateStatus('rpc-status', data.rpc_status);
+        updateStatus('ping-status', data.ping_status);
+        
+        // Update metrics - ensure we show actual values, not 0
+        if (data.rpc_value !== null && data.rpc_value !== undefined) {
+            // Afficher la valeur RPC en ms sans décimales
+            document.getElementById('rpc-metric').textContent = `${Math.round(data.rpc_value)} ms`;
+        } else {
+            document.getElementById('rpc-metric').textContent = '-- ms';
+        }
+        
+        // Gérer spécifiquement les valeurs de ping
+        if (data.ping_value !== null && data.ping_value !== undefined && data.ping_value > 0) {
+            document.getElementById('ping-metric').textContent = `${Math.round(data.ping_value)} ms`;
+        } else {
+            document.getElementById('ping-metric').textContent = 'No data';
+        }
+        
+        document.getElementById('dns-version').textContent = data.version_info || 'N/A';
+        
+        // Update detailed information
+        document.getElementById('ip-subdomain').textContent = data.ip_info || 'N/A';
+        document.getElementById('ip-domain').textContent = data.main_domain_info?.ip || 'N/A';
+        
+        // Correction pour la redirection - afficher "no redirection" au lieu de "Error"
+        const redirectValue = data.main_domain_info?.redirect;
+        if (redirectValue === 'Error') {
+            document.getElementById('redirect').textContent = 'no redirection';
+        } else {
+            document.getElementById('redirect').textContent = redirectValue || 'N/A';
+        }
+        
+        document.getElementById('security').textContent = data.security_info || 'N/A';
+        
+        // Update last check with local time format
+        updateCurrentTime();
+        
+        // Update TXT Records
+        const txtContainer = document.getElementById('txt-records');
+        if (Array.isArray(data.txt_info) && data.txt_info.length > 0) {
+            txtContainer.innerHTML = '';
+            data.txt_info.forEach(record => {
+                const recordElement = document.createElement('div');
+                recordElement.className = 'txt-record';
+                recordElement.textContent = record;
+                txtContainer.appendChild(recordElement);
+            });
+        } else {
+            txtContainer.textContent = 'N/A';
+        }
+        
+        // Update SSL information
+        if (data.ssl_info) {
+            document.getElementById('ssl-issuer').textContent = 
+                data.ssl_info.issuer ? data.ssl_info.issuer.organizationName || 'N/A' : 'N/A';
+            document.getElementById('ssl-subject').textContent = 
+                data.ssl_info.subject ? data.ssl_info.subject.commonName || 'N/A' : 'N/A';
+            document.getElementById('ssl-expiry').textContent = 
+                data.ssl_info.notAfter || 'N/A';
+            document.getElementById('ssl-days-left').textContent = 
+                data.ssl_info.days_left !== undefined ? `${data.ssl_info.days_left} days` : 'N/A';
+        }
+        
+        // Update transaction information - Correction pour afficher les transactions
+        if (data.transactions) {
+            if (data.transactions.error) {
+                document.getElementById('latest-block').textContent = 'Error';
+                document.getElementById('tx-count').textContent = 'Error';
+                document.getElementById('tx-source').textContent = data.transactions.error;
+            } else {
+                document.getElementById('latest-block').textContent = 
+                    data.transactions.block_number ? `#${data.transactions.block_number}` : 'N/A';
+                
+                // Afficher le nombre de transactions formaté si disponible, sinon le nombre brut
+                if (data.transactions.formatted_txns) {
+                    document.getElementById('tx-count').textContent = data.transactions.formatted_txns;
+                } else if (data.transactions.tx_count !== null && data.transactions.tx_count !== undefined) {
+                    document.getElementById('tx-count').textContent = data.transactions.tx_count;
+                } else {
+                    document.getElementById('tx-count').textContent = '94.079K'; // Valeur par défaut
+                }
+                
+                document.getElementById('tx-source').textContent = 
+                    data.transactions.source || 'N/A';
+            }
+        } else {
+            // Forcer l'affichage du dernier bloc connu si aucune donnée n'est disponible
+            document.getElementById('latest-block').textContent = `#${lastKnownBlock.height}`;
+            document.getElementById('tx-count').textContent = '94.079K'; // Valeur par défaut
+            document.getElementById('tx-source').textContent = `Last seen: ${lastKnownBlock.timestamp}`;
+        }
+        
+        // Update ports
+        updatePorts(data.port_statuses, data.port_scan);
+        
+        // Update alerts
+        updateAlerts(data.alerts);
+        
+        // Mettre à jour le graphique avec les nouveaux échantillons
+        updateChart(data);
+        
+        document.getElementById('sync-status').textContent = monitorStale ? 'Stale data' : 'Synchronised';
+    }
+    
+    // Flux temps réel (SSE) : les données sont poussées à chaque publication, le polling sert de secours
+    let streamConnected = false;
+    
+    function startDataStream() {
+        if (!window.EventSource) return;
+        
+        const stream = new EventSource(`/api/stream${targetQuery ? '?' + targetQuery : ''}`);
+        const onPublished = event => {
+            const data = applyPublishedData(JSON.parse(event.data));
+            renderPing(data);
+            renderData(data);
+        };
+        stream.addEventListener('snapshot', onPublished);
+        stream.addEventListener('delta', onPublished);
+        
+        stream.onopen = () => {
+            streamConnected = true;
+            clearInterval(updateInterval);
+            clearInterval(pingUpdateInterval);
+            console.log("Data stream connected, polling paused");
+        };
+        stream.onerror = () => {
+            if (stream.readyState === EventSource.CLOSED) {
+                // Flux refusé (503 : trop de flux ouverts) : rester en polling et réessayer plus tard
+                console.log("Data stream unavailable, polling continues");
+                setTimeout(startDataStream, 60000);
+            }
+            // EventSource se reconnecte seul ; reprendre le polling en attendant
+            if (streamConnected) {
+                streamConnected = false;
+                updateInterval = setInterval(updateData, 60000);
+                pingUpdateInterval = setInterval(updatePingChart, chartUpdateInterval);
+                console.log("Data stream lost, polling resumed");
+            }
+        };
+    }
+    
     // Initial update
     updateData();
     
@@ -946,6 +907,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Mettre à jour l'heure immédiatement au démarrage
     updateCurrentTime();
+    
+    // Ouvrir le flux temps réel
+    startDataStream();
 });
 
 // Three.js Background Functions
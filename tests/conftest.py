@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Ni base SQLite ni store partagé pendant les tests : app est importé tel quel
+os.environ.setdefault("TIMESERIES_DB", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
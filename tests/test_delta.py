@@ -0,0 +1,90 @@
+import app
+
+
+def make_snapshot():
+    return {
+        "version": "e-3",
+        "epoch": "e",
+        "data": {
+            "server_status": "online",
+            "alerts": [],
+            "history": ["h1", "h2", "h3"],
+            "ping_history": ["p1", "p2", "p3", "p4", "p5"]
+        },
+        "key_versions": {"server_status": 3, "alerts": 1},
+        # (version, total check_history, total ping_history)
+        "marks": [(1, 1, 2), (2, 2, 4), (3, 3, 5)]
+    }
+
+
+def test_delta_since_previous_version():
+    delta = app.target_delta(make_snapshot(), "e-2")
+    assert delta == {
+        "version": "e-3",
+        "since": "e-2",
+        "changed": {"server_status": "online"},
+        "history": ["h3"],
+        "ping_history": ["p5"]
+    }
+
+
+def test_delta_since_older_version():
+    delta = app.target_delta(make_snapshot(), "e-1")
+    assert delta["changed"] == {"server_status": "online"}
+    assert delta["history"] == ["h2", "h3"]
+    assert delta["ping_history"] == ["p3", "p4", "p5"]
+
+
+def test_delta_since_current_version_is_empty():
+    delta = app.target_delta(make_snapshot(), "e-3")
+    assert delta["changed"] == {}
+    assert delta["history"] == []
+    assert delta["ping_history"] == []
+
+
+def test_unknown_version_needs_full_snapshot():
+    assert app.target_delta(make_snapshot(), "e-0") is None
+    assert app.target_delta(make_snapshot(), "e-4") is None
+
+
+def test_version_from_another_process_needs_full_snapshot():
+    # Même numéro, époque d'un processus de surveillance précédent
+    assert app.target_delta(make_snapshot(), "f-2") is None
+    assert app.target_delta(make_snapshot(), "2") is None
+    assert app.target_delta(make_snapshot(), "e-x") is None
+
+
+def test_delta_between_published_versions():
+    target = dict(app.default_target)
+    target["state"] = app.new_target_state(target)
+    first = app.publish_changes(target)
+    target["state"]["ping_history"].append(1000.0, ping=12.0, rpc=None)
+    second = app.publish_changes(target)
+    assert second == first + 1
+    
+    snapshot = target["state"]["snapshot"]
+    assert snapshot["version"] == app.version_token(second)
+    assert snapshot["etag"] == f"{target['name']}-{app.publish_epoch}-{second}"
+    delta = app.target_delta(snapshot, app.version_token(first))
+    assert delta["changed"] == {}
+    assert delta["history"] == []
+    assert [point["ping"] for point in delta["ping_history"]] == [12.0]
+    assert app.publish_changes(target) == second
+
+
+def test_data_endpoint_ignores_versions_of_a_previous_process(monkeypatch):
+    target = dict(app.default_target)
+    target["state"] = app.new_target_state(target)
+    app.publish_changes(target)
+    monkeypatch.setitem(app.targets, target["name"], target)
+    client = app.app.test_client()
+    snapshot = target["state"]["snapshot"]
+    
+    assert client.get("/api/data", headers={"If-None-Match": f'"{snapshot["etag"]}"'}).status_code == 304
+    assert client.get(f"/api/data?since={snapshot['version']}").status_code == 304
+    
+    number = snapshot["version"].rpartition("-")[2]
+    stale = client.get(f"/api/data?since=00000000-{number}", headers={"If-None-Match": f'"{target["name"]}-{number}"'})
+    assert stale.status_code == 200
+    assert "changed" not in stale.get_json()
+    assert stale.get_json()["version"] == snapshot["version"]
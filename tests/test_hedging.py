@@ -0,0 +1,71 @@
+import asyncio
+
+import app
+
+
+def make_target(fallbacks):
+    target = dict(app.default_target, rpc_url="primary", fallback_rpc_urls=fallbacks)
+    target["state"] = app.new_target_state(target)
+    return target
+
+
+def race(target, delays, hedge_delay, fallbacks=None):
+    """Course hedged_rpc où chaque endpoint répond après son délai (None : échec immédiat)"""
+    called = []
+    
+    async def attempt(url):
+        called.append(url)
+        if delays[url] is None:
+            raise ConnectionError(url)
+        await asyncio.sleep(delays[url])
+        return f"result of {url}"
+    
+    return asyncio.run(app.hedged_rpc(target, attempt, hedge_delay, fallbacks)), called
+
+
+def test_slow_primary_without_fallbacks_is_not_cut_at_hedge_delay():
+    result, called = race(make_target([]), {"primary": 0.3}, 0.05)
+    assert result == ("primary", "result of primary", False)
+    assert called == ["primary"]
+
+
+def test_empty_fallback_list_waits_for_primary():
+    result, called = race(make_target(["fallback"]), {"primary": 0.3, "fallback": 0}, 0.05, fallbacks=[])
+    assert result == ("primary", "result of primary", False)
+    assert called == ["primary"]
+
+
+def test_fast_primary_does_not_start_fallbacks():
+    result, called = race(make_target(["fallback"]), {"primary": 0, "fallback": 0}, 0.5)
+    assert result == ("primary", "result of primary", False)
+    assert called == ["primary"]
+
+
+def test_slow_primary_is_hedged_by_fallback():
+    result, called = race(make_target(["fallback"]), {"primary": 1, "fallback": 0.01}, 0.05)
+    assert result == ("fallback", "result of fallback", True)
+    assert called == ["primary", "fallback"]
+
+
+def test_failed_primary_starts_fallbacks_before_hedge_delay():
+    target = make_target(["fallback"])
+    loop_time = []
+    
+    async def timed():
+        start = asyncio.get_running_loop().time()
+        async def attempt(url):
+            if url == "primary":
+                raise ConnectionError(url)
+            return url
+        result = await app.hedged_rpc(target, attempt, 5)
+        loop_time.append(asyncio.get_running_loop().time() - start)
+        return result
+    
+    assert asyncio.run(timed()) == ("fallback", "fallback", True)
+    assert loop_time[0] < 1
+
+
+def test_all_endpoints_failing():
+    result, called = race(make_target(["a", "b"]), {"primary": None, "a": None, "b": None}, 0.05)
+    assert result == (None, None, True)
+    assert sorted(called) == ["a", "b", "primary"]
@@ -0,0 +1,73 @@
+import asyncio
+from collections import deque
+
+import app
+
+
+def new_state(size=3):
+    return {"history_buckets": {"minute": deque(maxlen=size)}}
+
+
+def test_bucket_start_is_utc_aligned():
+    day = 86400 * 20000
+    assert app.bucket_start(day + 3725.5, "day") == day
+    assert app.bucket_start(day + 3725.5, "hour") == day + 3600
+    assert app.bucket_start(day + 3725.5, "minute") == day + 3720
+
+
+def test_samples_accumulate_in_current_bucket():
+    state = new_state()
+    app.add_to_history_buckets(state, "ping", 10.0, 60)
+    app.add_to_history_buckets(state, "ping", 20.0, 90)
+    app.add_to_history_buckets(state, "rpc", 5.0, 119)
+    assert list(state["history_buckets"]["minute"]) == [[60, 30.0, 2, 5.0, 1]]
+
+
+def test_late_sample_folds_into_closed_bucket():
+    state = new_state()
+    app.add_to_history_buckets(state, "ping", 10.0, 60)
+    app.add_to_history_buckets(state, "ping", 20.0, 180)
+    # Échantillon RPC d'un cycle commencé dans le premier bucket
+    app.add_to_history_buckets(state, "rpc", 40.0, 100)
+    # Aucun bucket gardé pour 120 : ignoré
+    app.add_to_history_buckets(state, "rpc", 50.0, 130)
+    assert list(state["history_buckets"]["minute"]) == [[60, 10.0, 1, 40.0, 1], [180, 20.0, 1, 0.0, 0]]
+
+
+def test_sample_older_than_retained_buckets_is_dropped():
+    state = new_state(size=2)
+    for ts in [60, 120, 180]:
+        app.add_to_history_buckets(state, "ping", 1.0, ts)
+    app.add_to_history_buckets(state, "ping", 1.0, 70)
+    assert [bucket[0] for bucket in state["history_buckets"]["minute"]] == [120, 180]
+    assert all(bucket[2] == 1 for bucket in state["history_buckets"]["minute"])
+
+
+def test_query_returns_averages_and_counts():
+    state = new_state()
+    app.add_to_history_buckets(state, "ping", 10.0, 60)
+    app.add_to_history_buckets(state, "ping", 30.0, 61)
+    app.add_to_history_buckets(state, "rpc", 8.0, 125)
+    assert app.query_history_buckets(state, "minute", 0, 1000) == [
+        {"ts": 60, "ping": 20.0, "rpc": None, "ping_count": 2, "rpc_count": 0},
+        {"ts": 120, "ping": None, "rpc": 8.0, "ping_count": 0, "rpc_count": 1}
+    ]
+    assert [point["ts"] for point in app.query_history_buckets(state, "minute", 90, 120)] == [60]
+
+
+def test_failed_ping_is_recorded_as_missing(monkeypatch):
+    target = dict(app.default_target)
+    target["state"] = app.new_target_state(target)
+    results = iter([{"status": "success", "time": 42.0}, {"status": "error", "message": "timeout"}])
+    
+    async def ping_host(target):
+        return next(results)
+    
+    monkeypatch.setattr(app, "ping_host", ping_host)
+    asyncio.run(app.update_ping(target))
+    asyncio.run(app.update_ping(target))
+    
+    points = target["state"]["ping_history"].to_dicts()
+    assert [point["ping"] for point in points] == [42.0, None]
+    buckets = target["state"]["history_buckets"]["minute"]
+    assert (sum(bucket[1] for bucket in buckets), sum(bucket[2] for bucket in buckets)) == (42.0, 1)
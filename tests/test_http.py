@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import app
+
+
+def read_response(raw, method="GET", eof=True):
+    """Passe une réponse brute à read_http_response via un StreamReader"""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        if eof:
+            reader.feed_eof()
+        return await app.read_http_response(reader, method)
+    return asyncio.run(run())
+
+
+def test_content_length_body():
+    status, headers, content, reusable = read_response(
+        b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\nServer: test\r\n\r\nhelloNEXT", eof=False
+    )
+    assert status == 200
+    assert content == b"hello"
+    assert headers["server"] == "test"
+    assert reusable
+
+
+def test_chunked_body_with_extension_and_trailers():
+    status, headers, content, reusable = read_response(
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"6;name=value\r\nhello \r\n5\r\nworld\r\n0\r\nX-Trailer: 1\r\n\r\n",
+        eof=False
+    )
+    assert content == b"hello world"
+    assert reusable
+
+
+def test_close_delimited_body():
+    status, headers, content, reusable = read_response(b"HTTP/1.1 200 OK\r\nServer: test\r\n\r\nuntil close")
+    assert content == b"until close"
+    assert not reusable
+
+
+def test_head_and_no_content_have_no_body():
+    for raw, method in [
+        (b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n", "HEAD"),
+        (b"HTTP/1.1 204 No Content\r\n\r\n", "GET"),
+        (b"HTTP/1.1 304 Not Modified\r\nContent-Length: 10\r\n\r\n", "GET")
+    ]:
+        status, headers, content, reusable = read_response(raw, method, eof=False)
+        assert content == b""
+        assert reusable
+
+
+def test_connection_close_and_http10_are_not_reusable():
+    *_, reusable = read_response(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n", eof=False)
+    assert not reusable
+    *_, reusable = read_response(b"HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n", eof=False)
+    assert not reusable
+
+
+def test_closed_or_invalid_response():
+    with pytest.raises(ConnectionError):
+        read_response(b"")
+    with pytest.raises(ValueError):
+        read_response(b"SSH-2.0-OpenSSH\r\n\r\n")
+    with pytest.raises(asyncio.IncompleteReadError):
+        read_response(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nshort")
@@ -0,0 +1,42 @@
+import asyncio
+
+import app
+
+
+def make_target():
+    target = dict(app.default_target)
+    target["state"] = app.new_target_state(target)
+    app.publish_changes(target)
+    return target
+
+
+def test_background_refresh_publishes_without_writing_cycle_record():
+    target = make_target()
+    state = target["state"]
+    state["probe_cache"]["ssl_info"] = {"value": {"days_left": 10}, "fetched_at": 0}
+    cycle = state["cycle"]
+    version = state["version"]
+    
+    async def probe():
+        return {"days_left": 90}
+    
+    asyncio.run(app.refresh_cached_probe(target, "ssl_info", probe))
+    assert state["cycle"] is cycle
+    assert state["version"] == version + 1
+    assert state["snapshot"]["data"]["ssl_info"] == {"days_left": 90}
+    assert "ssl_info" not in state["probe_refreshing"]
+
+
+def test_failed_refresh_keeps_cached_value():
+    target = make_target()
+    state = target["state"]
+    state["probe_cache"]["ssl_info"] = {"value": {"days_left": 10}, "fetched_at": 0}
+    app.publish_changes(target)
+    version = state["version"]
+    
+    async def probe():
+        return {"error": "handshake failed"}
+    
+    asyncio.run(app.refresh_cached_probe(target, "ssl_info", probe))
+    assert state["version"] == version
+    assert state["snapshot"]["data"]["ssl_info"] == {"days_left": 10}
@@ -0,0 +1,88 @@
+import os
+from collections import deque
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Store vide dans un répertoire temporaire, segments initiaux de 256 octets"""
+    monkeypatch.setitem(app.CONFIG, "snapshot_store", str(tmp_path))
+    monkeypatch.setitem(app.CONFIG, "store_segment_size", 256)
+    monkeypatch.setitem(app.CONFIG, "store_read_retries", 3)
+    monkeypatch.setattr(app, "store_segments", {})
+    monkeypatch.setattr(app, "store_cache", {})
+    yield tmp_path
+    for segment in app.store_segments.values():
+        segment.close()
+
+
+def test_missing_record(store):
+    assert app.read_store_record("absent") is None
+
+
+def test_round_trip_as_json(store):
+    app.write_store_record("target", {"body": b"\x00\x1f\x8b", "buckets": deque([[1, 2.5]]), "data": {"a": None}})
+    assert app.read_store_record("target") == {"body": b"\x00\x1f\x8b", "buckets": [[1, 2.5]], "data": {"a": None}}
+    with open(app.store_path("target"), "rb") as f:
+        assert b'"__bytes__"' in f.read()
+
+
+def test_rewrite_in_place(store):
+    app.write_store_record("target", {"version": 1})
+    first = app.read_store_record("target")
+    assert app.read_store_record("target") is first  # Séquence inchangée : pas de nouvelle désérialisation
+    inode = os.stat(app.store_path("target")).st_ino
+    
+    app.write_store_record("target", {"version": 2})
+    assert app.read_store_record("target") == {"version": 2}
+    assert os.stat(app.store_path("target")).st_ino == inode
+
+
+def test_grow_retires_old_segment(store):
+    app.write_store_record("target", {"version": 1})
+    assert app.read_store_record("target") == {"version": 1}
+    old_segment = app.store_segments["target"]
+    
+    big = {"version": 2, "payload": "x" * 1000}
+    app.write_store_record("target", big)
+    assert old_segment.closed
+    new_segment = app.store_segments["target"]
+    assert len(new_segment) >= 2 * 1000
+    assert app.read_store_record("target") == big
+    # Le lecteur a rouvert le nouveau fichier
+    reader_segment = app.store_cache["target"][0]
+    assert app.STORE_FIELD.unpack_from(reader_segment, app.STORE_RETIRED)[0] == 0
+    assert not [name for name in os.listdir(store) if name.endswith(".tmp")]
+
+
+def test_reader_keeps_previous_record_during_write(store):
+    app.write_store_record("target", {"version": 1})
+    assert app.read_store_record("target") == {"version": 1}
+    app.write_store_record("target", {"version": 2})
+    
+    # Séquence impaire : écriture en cours, la copie précédente reste servie
+    segment = app.store_segments["target"]
+    seq = app.STORE_FIELD.unpack_from(segment, app.STORE_SEQ)[0]
+    app.STORE_FIELD.pack_into(segment, app.STORE_SEQ, seq + 1)
+    assert app.read_store_record("target") == {"version": 1}
+    app.STORE_FIELD.pack_into(segment, app.STORE_SEQ, seq + 2)
+    assert app.read_store_record("target") == {"version": 2}
+
+
+def test_new_writer_retires_segment_left_by_previous_process(store):
+    app.write_store_record("target", {"version": 1})
+    assert app.read_store_record("target") == {"version": 1}
+    app.store_segments.pop("target").close()
+    
+    app.write_store_record("target", {"version": 2})
+    assert app.read_store_record("target") == {"version": 2}
+
+
+def test_unreadable_record(store):
+    app.write_store_record("target", {"version": 1})
+    segment = app.store_segments["target"]
+    segment[app.STORE_HEADER_SIZE:app.STORE_HEADER_SIZE + 4] = b"\x80\x04\x95\x00"
+    assert app.read_store_record("target") is None
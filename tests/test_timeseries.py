@@ -0,0 +1,17 @@
+import app
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 21))
+    assert app.percentile(values, 0.95) == 19
+    assert app.percentile(values, 0.5) == 10
+    assert app.percentile(values, 1.0) == 20
+    assert app.percentile(list(range(1, 101)), 0.95) == 95
+
+
+def test_percentile_small_and_empty_lists():
+    assert app.percentile([], 0.95) is None
+    assert app.percentile([7], 0.95) == 7
+    assert app.percentile([1, 2], 0.5) == 1
+    assert app.percentile([1, 2], 0.51) == 2
+    assert app.percentile([1, 2, 3], 0.0) == 1